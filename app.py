@@ -1,11 +1,14 @@
 import streamlit as st
-import time
-from model import YoutubeTitlePredictor
+from model import YoutubeTitlePredictor, BACKENDS
 from gemini_helper import GeminiTitleGenerator
+from jobs import default_scheduler, ACTIVE_STATUSES
+from metrics import default_metrics
 from config import (
     YOUTUBE_API_KEY,
     DEFAULT_EPOCHS,
-    DEFAULT_BATCH_SIZE
+    DEFAULT_BATCH_SIZE,
+    JOB_POLL_INTERVAL,
+    METRICS_ENABLED
 )
 
 # Configure page settings
@@ -101,41 +104,113 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 def initialize_predictor():
-    """Initialize the YouTube Title Predictor"""
-    try:
-        return YoutubeTitlePredictor(YOUTUBE_API_KEY)
-    except Exception as e:
-        st.error(f"Error initializing YouTube API: {str(e)}")
-        st.stop()
+    """Initialize the YouTube Title Predictor once per session"""
+    # Trained models are shared process-wide by the model registry; the
+    # predictor itself holds per-session training state
+    if "youtube_predictor" not in st.session_state:
+        try:
+            st.session_state.youtube_predictor = YoutubeTitlePredictor(YOUTUBE_API_KEY)
+        except Exception as e:
+            st.error(f"Error initializing YouTube API: {str(e)}")
+            st.stop()
+    return st.session_state.youtube_predictor
+
+@st.cache_resource
+def create_gemini_generator():
+    """Create the Gemini Title Generator shared by all sessions"""
+    return GeminiTitleGenerator()
 
 def initialize_gemini():
     """Initialize the Gemini Title Generator"""
     try:
-        return GeminiTitleGenerator()
+        return create_gemini_generator()
     except Exception as e:
         st.error(f"Error initializing Gemini API: {str(e)}")
         st.stop()
 
-def display_training_results(titles, history):
-    """Display training results with animation"""
+def display_training_results(titles, history, filtered=None):
+    """Display training results (final metrics, removed titles and sample titles)"""
     with st.container():
         st.markdown('<div class="card">', unsafe_allow_html=True)
-        st.success("✨ Model trained successfully!")
-        
-        # Animated progress display
-        progress_bar = st.progress(0)
-        for i in range(100):
-            progress_bar.progress(i + 1)
-            time.sleep(0.01)
+        epochs = len(history.get("loss", []))
+        summary = ", ".join(f"{key} {values[-1]:.3f}" for key, values in history.items() if values)
+        st.success(f"✨ Model trained successfully in {epochs} epoch{'s' if epochs != 1 else ''}!"
+                   + (f" ({summary})" if summary else ""))
+        if epochs > 1:
+            st.line_chart({key: values for key, values in history.items() if "loss" in key})
+        if filtered:
+            st.caption(f"Trained on {filtered['kept']} of {filtered['total']} titles: removed "
+                       f"{filtered['skipped']} shorts/live, {filtered['duplicates']} duplicates "
+                       f"and {filtered['near_duplicates']} near-duplicates.")
         
-        # Sample titles with animation
         st.subheader("🎯 Sample Original Titles")
-        for i, title in enumerate(titles[:5]):
-            time.sleep(0.2)  # Creates a typing effect
-            st.write(f"#{i+1}: {title}")
+        st.markdown("\n".join(f"{i+1}. {title}" for i, title in enumerate(titles[:5])))
         
         st.markdown('</div>', unsafe_allow_html=True)
 
+def display_variations(title, channel_name):
+    """Stream Gemini clickbait variations into the page as they arrive"""
+    placeholder = st.empty()
+    with st.spinner("✍️ Creating variations..."):
+        gemini_generator = initialize_gemini()
+        clickbait_titles = ""
+        for chunk in gemini_generator.stream_clickbait_titles(title, channel_name):
+            clickbait_titles += chunk
+            # No slide-in animation: it would replay on every streamed chunk
+            placeholder.markdown(f"""
+            <div class="card" style="animation: none;">
+                {clickbait_titles}
+            </div>
+            """, unsafe_allow_html=True)
+
+def display_training_job(job_id):
+    """Show the status of a background training job"""
+    scheduler = default_scheduler()
+    job = scheduler.status(job_id)
+    if job is None:
+        return
+
+    if job["status"] == "queued":
+        st.info("⏳ Training job queued, waiting for a free worker...")
+    elif job["status"] == "running":
+        metrics = job["metrics"] or {}
+        loss = f" · loss {metrics['loss']:.3f}" if "loss" in metrics else ""
+        st.progress(job["epoch"] / job["epochs"],
+                    text=f"🧠 Training epoch {job['epoch']}/{job['epochs']}{loss}")
+    elif job["status"] == "completed":
+        display_training_results(job["result"]["titles"], job["result"]["history"],
+                                 job["result"].get("filtered"))
+    elif job["status"] == "cancelled":
+        st.warning("🛑 Training cancelled.")
+    else:
+        st.error(f"❌ Training error: {job['error']}")
+
+    if job["status"] in ACTIVE_STATUSES and st.button("🛑 Cancel Training"):
+        scheduler.cancel(job_id)
+
+def poll_training_job(job_id):
+    """Show a training job, refreshing only that part of the page while it is active"""
+    job = default_scheduler().status(job_id)
+    active = job is not None and job["status"] in ACTIVE_STATUSES
+    # A fragment reruns on its own, leaving generated titles on the page untouched
+    st.fragment(display_training_job, run_every=JOB_POLL_INTERVAL if active else None)(job_id)
+
+def display_diagnostics():
+    """Show stage timings, API quota and cache counters of this process and its training jobs"""
+    metrics = default_metrics()
+    with st.expander("📊 Diagnostics"):
+        snapshot = metrics.snapshot()
+        st.caption("Training jobs run in worker processes; their timings are added here "
+                   "once each job finishes.")
+        if snapshot["timings"]:
+            st.dataframe(snapshot["timings"], use_container_width=True)
+        if snapshot["counters"]:
+            st.dataframe(snapshot["counters"], use_container_width=True)
+        if not snapshot["timings"] and not snapshot["counters"]:
+            st.info("Nothing recorded yet.")
+        st.download_button("⬇️ Prometheus metrics", metrics.prometheus(),
+                           file_name="metrics.prom", mime="text/plain")
+
 def main():
     # Title and Introduction
     st.markdown('<h1 class="title">🎥 YouTube Title Generator</h1>', unsafe_allow_html=True)
@@ -145,9 +220,8 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
-    # Initialize predictors
+    # Initialize predictor (Gemini is set up only when variations are requested)
     youtube_predictor = initialize_predictor()
-    gemini_generator = initialize_gemini()
     
     # Create two columns for layout
     col1, col2 = st.columns([1, 2])
@@ -161,8 +235,13 @@ def main():
         channel_name = st.text_input("Channel Name", placeholder="Enter channel name...")
         
         with st.expander("⚙️ Advanced Options"):
+            backend = st.selectbox("Model Type", BACKENDS,
+                                   format_func=lambda name: {"lstm": "LSTM (slower, richer)",
+                                                             "ngram": "N-gram (trains instantly)"}[name])
             epochs = st.slider("Training Epochs", 10, 100, DEFAULT_EPOCHS)
             batch_size = st.slider("Batch Size", 16, 64, DEFAULT_BATCH_SIZE)
+            warm_start = st.checkbox("Fine-tune existing model on new videos only",
+                                     help="Trains on titles published since the last training plus a sample of older ones")
         
         train_button = st.button("🚀 Train Model")
         st.markdown('</div>', unsafe_allow_html=True)
@@ -179,22 +258,23 @@ def main():
         # Handle Training
         if train_button and channel_id:
             try:
-                with st.spinner("🧠 Training model... This may take several minutes."):
-                    titles, history = youtube_predictor.train(
-                        channel_id, 
-                        epochs=epochs,
-                        batch_size=batch_size
-                    )
-                    youtube_predictor.save_model()
-                    display_training_results(titles, history)
-                    
+                st.session_state.training_job = default_scheduler().submit(
+                    channel_id, 
+                    epochs=epochs,
+                    batch_size=batch_size,
+                    backend=backend,
+                    warm_start=warm_start
+                )
             except Exception as e:
                 st.error(f"❌ Training error: {str(e)}")
+
+        if "training_job" in st.session_state:
+            poll_training_job(st.session_state.training_job)
         
         # Handle Generation
         if generate_button and seed_text:
             try:
-                youtube_predictor.load_model()
+                youtube_predictor.load_model(channel_id or None)
                 
                 with st.spinner("🎯 Generating title..."):
                     generated_title = youtube_predictor.generate_title(
@@ -202,19 +282,12 @@ def main():
                         next_words=num_words
                     )
                 
+                # Show the model's title right away, before the Gemini round trip
+                st.markdown("### 🎨 Generated Titles")
+                st.markdown(f"**{generated_title}**")
+                
                 if channel_name:
-                    st.markdown("### 🎨 Generated Titles")
-                    
-                    with st.spinner("✍️ Creating variations..."):
-                        clickbait_titles = gemini_generator.generate_clickbait_titles(
-                            generated_title,
-                            channel_name
-                        )
-                        st.markdown(f"""
-                        <div class="card" style="animation: slideUp 0.5s ease-out;">
-                            {clickbait_titles}
-                        </div>
-                        """, unsafe_allow_html=True)
+                    display_variations(generated_title, channel_name)
                 else:
                     st.info("👉 Add a channel name to generate Hinglish clickbait titles!")
                     
@@ -225,5 +298,8 @@ def main():
         
         st.markdown('</div>', unsafe_allow_html=True)
 
+    if METRICS_ENABLED:
+        display_diagnostics()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
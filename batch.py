@@ -0,0 +1,158 @@
+"""Generate titles for many seeds without the Streamlit UI.
+
+Seeds are read from a JSONL file (objects with a ``seed`` field and an
+optional ``id``) or a CSV file with a ``seed`` column (and optional ``id``).
+Results are appended to a JSONL file as each batch completes. Re-running
+the same command skips seeds whose ids are already in the output, so an
+interrupted run resumes where it stopped.
+
+Usage:
+    python batch.py seeds.jsonl results.jsonl --channel UC... [--gemini-channel-name NAME]
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+from itertools import islice
+from config import YOUTUBE_API_KEY, BATCH_SIZE, GEMINI_CONCURRENCY
+
+
+def read_seeds(path):
+    """Yield (id, seed) pairs from a JSONL or CSV file.
+
+    Rows without an id, or with an empty one, are numbered by position.
+    Ids must be unique, since resuming skips seeds by id.
+    """
+    seen = set()
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for index, row in enumerate(rows):
+            seed_id = row.get("id")
+            seed_id = str(index if seed_id is None or not str(seed_id).strip() else seed_id)
+            if seed_id in seen:
+                raise ValueError(f"Duplicate seed id '{seed_id}' in {path}")
+            seen.add(seed_id)
+            yield seed_id, row["seed"]
+
+
+def completed_ids(path):
+    """Return the ids already written to an output file.
+
+    A partially written last line left by an interrupted run is truncated
+    so new results start on a fresh line.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    return {json.loads(line)["id"] for line in data.decode("utf-8").splitlines() if line.strip()}
+
+
+def generate_batches(predictor, seeds, next_words=6, batch_size=BATCH_SIZE,
+                     gemini=None, channel_name=None, concurrency=GEMINI_CONCURRENCY):
+    """Yield lists of result dicts, one list per batch of (id, seed) pairs.
+
+    Each batch is decoded with a single batched ``generate_titles`` call.
+    With ``gemini`` set, every generated title is also expanded into
+    clickbait variations with at most ``concurrency`` requests in flight.
+    Empty seeds are neither decoded nor sent to Gemini; their results hold
+    an ``error`` instead of a ``title``.
+    """
+    seeds = iter(seeds)
+    while True:
+        batch = list(islice(seeds, batch_size))
+        if not batch:
+            return
+
+        results = [{"id": seed_id, "seed": seed} for seed_id, seed in batch]
+        valid = []
+        for result in results:
+            if isinstance(result["seed"], str) and result["seed"].strip():
+                valid.append(result)
+            else:
+                result["error"] = "Seed text cannot be empty"
+
+        if not valid:
+            yield results
+            continue
+
+        titles = predictor.generate_titles([result["seed"] for result in valid], next_words)
+        for result, title in zip(valid, titles):
+            result["title"] = title
+
+        if gemini is not None:
+            variations = asyncio.run(gemini.generate_many(titles, channel_name, concurrency))
+            for result, variation in zip(valid, variations):
+                if isinstance(variation, Exception):
+                    result["error"] = str(variation)
+                else:
+                    result["variations"] = variation
+
+        yield results
+
+
+def run_batch(input_path, output_path, channel=None, next_words=6, batch_size=BATCH_SIZE,
+              gemini_channel_name=None, concurrency=GEMINI_CONCURRENCY, restart=False,
+              progress=None):
+    """Generate titles for every seed in ``input_path``; return the number written.
+
+    ``progress`` is called with the total number of seeds done after each batch.
+    """
+    from model import YoutubeTitlePredictor
+
+    if restart and os.path.exists(output_path):
+        os.remove(output_path)
+    done = completed_ids(output_path)
+    seeds = ((seed_id, seed) for seed_id, seed in read_seeds(input_path) if seed_id not in done)
+
+    predictor = YoutubeTitlePredictor(YOUTUBE_API_KEY)
+    predictor.load_model(channel)
+    gemini = None
+    if gemini_channel_name:
+        from gemini_helper import GeminiTitleGenerator
+        gemini = GeminiTitleGenerator()
+
+    written = 0
+    with open(output_path, "a", encoding="utf-8") as out:
+        for results in generate_batches(predictor, seeds, next_words, batch_size,
+                                        gemini, gemini_channel_name, concurrency):
+            out.write("".join(json.dumps(result, ensure_ascii=False) + "\n"
+                              for result in results))
+            out.flush()
+            os.fsync(out.fileno())
+            written += len(results)
+            if progress is not None:
+                progress(len(done) + written)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="seeds file (.jsonl or .csv)")
+    parser.add_argument("output", help="results file (.jsonl), also used to resume")
+    parser.add_argument("--channel", help="channel ID or name of the trained model")
+    parser.add_argument("--next-words", type=int, default=6)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--gemini-channel-name",
+                        help="also generate Gemini clickbait variations for this channel name")
+    parser.add_argument("--concurrency", type=int, default=GEMINI_CONCURRENCY,
+                        help="maximum concurrent Gemini requests")
+    parser.add_argument("--restart", action="store_true",
+                        help="discard existing results instead of resuming")
+    args = parser.parse_args()
+
+    run_batch(args.input, args.output, args.channel, args.next_words, args.batch_size,
+              args.gemini_channel_name, args.concurrency, args.restart,
+              progress=lambda done: print(f"{done} seeds done"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Titles and training examples removed by the title filter, and its cost.
+
+The synthetic corpus is padded with reuploads (same title, different case
+or spacing, or one extra word) and numbered series episodes. Its small
+shared vocabulary makes unrelated titles collide in the MinHash bands far
+more often than real titles do, so the filter times are an upper bound.
+
+Usage: python benchmarks/bench_dedup.py [--sizes 200 5000 50000] [--repeats 0.3]
+"""
+import argparse
+import random
+import time
+
+from synthetic import synthetic_titles
+from title_filter import TitleFilter
+from vocabulary import Vocabulary
+
+
+def with_repeats(titles, fraction, seed=0):
+    """Return titles plus ``fraction`` as many reuploads and series episodes"""
+    rng = random.Random(seed)
+    repeats = []
+    for title in rng.sample(titles, int(len(titles) * fraction)):
+        kind = rng.randrange(3)
+        if kind == 0:
+            repeats.append("  " + title.upper())
+        elif kind == 1:
+            repeats.append(f"{title} reupload")
+        else:
+            repeats.append(f"{title} episode {rng.randint(2, 200)}")
+    corpus = titles + repeats
+    rng.shuffle(corpus)
+    return corpus
+
+
+def num_examples(titles):
+    """Number of n-gram prefix examples ``prepare_sequences`` builds from titles"""
+    _, lengths = Vocabulary.split(titles)
+    return int((lengths - 1).clip(min=0).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 5000, 50000])
+    parser.add_argument("--repeats", type=float, default=0.3,
+                        help="reuploads and episodes added per original title")
+    args = parser.parse_args()
+
+    title_filter = TitleFilter()
+    print(f"{'titles':>8} {'kept':>8} {'dupes':>6} {'near':>6} "
+          f"{'examples':>9} {'after':>9} {'filter s':>9}")
+    for size in args.sizes:
+        titles = with_repeats(synthetic_titles(size, min_words=5, seed=size), args.repeats)
+        start = time.perf_counter()
+        kept, report = title_filter.filter(titles)
+        elapsed = time.perf_counter() - start
+
+        print(f"{len(titles):>8} {report.kept:>8} {report.duplicates:>6} "
+              f"{report.near_duplicates:>6} {num_examples(titles):>9} "
+              f"{num_examples(kept):>9} {elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
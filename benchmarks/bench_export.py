@@ -0,0 +1,84 @@
+"""Compare the Keras (h5) model with its exported TFLite versions.
+
+For every quantization mode this reports the artifact size, greedy
+generation latency (one seed and a batch of seeds) with the speedup over
+the Keras model, and the accuracy change: top-1 accuracy on the training
+examples, how often the exported model picks the same next word as the
+Keras model, and how often whole generated titles agree word for word.
+
+Usage: python benchmarks/bench_export.py [--epochs 20] [--repeats 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from synthetic import synthetic_titles, trained_predictor
+from generation import TitleGenerationEngine
+from sequences import SequenceStream
+from tflite_model import TFLiteModel, QUANTIZATIONS
+from bench_incremental import token_match
+
+
+def best_time(function, repeats):
+    """Return the best wall time of ``repeats`` calls and the last result"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=200)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--next-words", type=int, default=6)
+    parser.add_argument("--seeds", type=int, default=64)
+    parser.add_argument("--examples", type=int, default=2048)
+    args = parser.parse_args()
+
+    titles = synthetic_titles(args.titles)
+    predictor = trained_predictor(args.titles, epochs=args.epochs)
+    seeds = [" ".join(title.split()[:2]) for title in titles[:args.seeds]]
+    stream = SequenceStream(predictor.tokenizer.texts_to_sequences(titles),
+                            predictor.max_sequence_len, shuffle=False)
+    X, y = stream.make_batch(np.arange(min(args.examples, stream.num_examples)))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "model.h5")
+        predictor.model.save(path)
+        models = [("h5", os.path.getsize(path), predictor.model)]
+    for quantization in QUANTIZATIONS:
+        exported = TFLiteModel.convert(predictor.model, quantization)
+        models.append((f"tflite {quantization}", len(exported.content), exported))
+
+    results = []
+    for name, size, model in models:
+        engine = TitleGenerationEngine(model, predictor.tokenizer, predictor.max_sequence_len)
+        engine.generate(seeds, 1)  # warm up graphs and interpreter buffers
+        single, _ = best_time(lambda: engine.generate(seeds[:1], args.next_words), args.repeats)
+        batched, generated = best_time(lambda: engine.generate(seeds, args.next_words),
+                                       args.repeats)
+        predicted = np.argmax(engine.predict_proba(X), axis=-1)
+        results.append((name, size, single, batched, predicted, generated))
+
+    _, _, _, base_batched, base_predicted, base_titles = results[0]
+    base_accuracy = np.mean(base_predicted == y)
+    print(f"examples: {len(y)}, seeds per batch: {len(seeds)}, words: {args.next_words}")
+    print(f"{'model':<16} {'MiB':>6} {'single ms':>10} {'batch ms':>9} {'speedup':>8} "
+          f"{'accuracy':>9} {'delta':>7} {'top-1 agree':>12} {'title match':>12}")
+    for name, size, single, batched, predicted, generated in results:
+        accuracy = np.mean(predicted == y)
+        print(f"{name:<16} {size / 2 ** 20:>6.2f} {single * 1000:>10.2f} {batched * 1000:>9.2f} "
+              f"{base_batched / batched:>7.1f}x {accuracy:>9.1%} "
+              f"{accuracy - base_accuracy:>+7.1%} {np.mean(predicted == base_predicted):>12.1%} "
+              f"{token_match(base_titles, generated):>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
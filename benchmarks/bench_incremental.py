@@ -0,0 +1,68 @@
+"""Compare windowed greedy decoding with the cached-state incremental engines.
+
+``exact`` reuses cached padding states and must match the windowed decoder
+token for token; ``stateful`` carries (h, c) forward at one recurrent step
+per word and reports how often it agrees with the windowed output.
+
+Usage: python benchmarks/bench_incremental.py [--epochs 20] [--repeats 3]
+"""
+import argparse
+import time
+
+from synthetic import trained_predictor
+from incremental import IncrementalGenerationEngine
+
+SEEDS = ["minecraft", "how to make", "best ever", "epic fail", "top ten tips"]
+
+
+def time_generation(engine, seeds, next_words, repeats):
+    """Return the best wall time of ``repeats`` runs and the generated titles"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        titles = engine.generate(seeds, next_words)
+        best = min(best, time.perf_counter() - start)
+    return best, titles
+
+
+def token_match(expected, actual):
+    """Return the fraction of word positions where two title lists agree"""
+    matched = total = 0
+    for a, b in zip(expected, actual):
+        a, b = a.split(), b.split()
+        total += max(len(a), len(b))
+        matched += sum(x == y for x, y in zip(a, b))
+    return matched / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=200)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    predictor = trained_predictor(args.titles, epochs=args.epochs)
+    windowed = predictor._get_engine(incremental=False)
+    exact = predictor._get_engine(incremental=True)
+    stateful = IncrementalGenerationEngine(predictor.model, predictor.tokenizer,
+                                           predictor.max_sequence_len, exact=False)
+    # Warm up all graphs and the padding state cache before timing
+    for engine in (windowed, exact, stateful):
+        engine.generate(SEEDS, 1)
+
+    print(f"window length: {windowed.window_len}, seeds per batch: {len(SEEDS)}")
+    print(f"{'words':>6} {'windowed ms':>12} {'exact ms':>9} {'stateful ms':>12} "
+          f"{'exact match':>12} {'stateful match':>15}")
+    for next_words in args.lengths:
+        windowed_time, windowed_titles = time_generation(windowed, SEEDS, next_words, args.repeats)
+        exact_time, exact_titles = time_generation(exact, SEEDS, next_words, args.repeats)
+        stateful_time, stateful_titles = time_generation(stateful, SEEDS, next_words, args.repeats)
+
+        print(f"{next_words:>6} {windowed_time * 1000:>12.1f} {exact_time * 1000:>9.1f} "
+              f"{stateful_time * 1000:>12.1f} {token_match(windowed_titles, exact_titles):>12.1%} "
+              f"{token_match(windowed_titles, stateful_titles):>15.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Peak memory and time of materialized vs streamed training sequences.
+
+Usage: python benchmarks/bench_sequences.py [--sizes 200 5000 50000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from synthetic import offline_predictor, synthetic_titles
+
+
+def measure(function):
+    """Run ``function`` and return (seconds, peak traced MiB, result)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, result
+
+
+def materialized(titles):
+    X, y, _ = offline_predictor().prepare_sequences(titles)
+    return len(y)
+
+
+def streamed(titles, batch_size):
+    stream, _ = offline_predictor().prepare_stream(titles, batch_size=batch_size)
+    return sum(len(y) for _, y in stream.batches())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 5000, 50000])
+    parser.add_argument("--max-words", type=int, default=12)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    # Warm up lazily loaded TensorFlow modules so they are not measured
+    materialized(synthetic_titles(20))
+    streamed(synthetic_titles(20), args.batch_size)
+
+    print(f"{'titles':>8} {'examples':>9} {'dense s':>8} {'dense MiB':>10} "
+          f"{'stream s':>9} {'stream MiB':>11}")
+    for size in args.sizes:
+        titles = synthetic_titles(size, max_words=args.max_words)
+        dense_time, dense_peak, examples = measure(lambda: materialized(titles))
+        stream_time, stream_peak, streamed_examples = measure(
+            lambda: streamed(titles, args.batch_size))
+        assert examples == streamed_examples
+
+        print(f"{size:>8} {examples:>9} {dense_time:>8.2f} {dense_peak:>10.1f} "
+              f"{stream_time:>9.2f} {stream_peak:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
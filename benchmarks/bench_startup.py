@@ -0,0 +1,57 @@
+"""Measure cold import time of the app modules in fresh interpreters.
+
+Each module is imported in a new Python process so nothing is cached
+between runs. The report shows the best import time and whether the import
+pulled in TensorFlow or the Gemini client.
+
+Usage: python benchmarks/bench_startup.py [--repeats 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["config", "model", "gemini_helper", "jobs"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "tensorflow": "tensorflow" in sys.modules,
+    "gemini": "google.generativeai" in sys.modules,
+}}))
+"""
+
+
+def probe(statement):
+    """Run ``statement`` in a fresh interpreter and return its measurements"""
+    output = subprocess.run([sys.executable, "-c", PROBE.format(statement=statement)],
+                            cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    statements = {module: f"import {module}" for module in MODULES}
+    statements["YoutubeTitlePredictor()"] = (
+        "from model import YoutubeTitlePredictor\n"
+        "YoutubeTitlePredictor('benchmark-key')")
+
+    print(f"{'startup step':<26} {'best ms':>8} {'tensorflow':>11} {'gemini':>7}")
+    for name, statement in statements.items():
+        results = [probe(statement) for _ in range(args.repeats)]
+        best = min(result["seconds"] for result in results)
+        print(f"{name:<26} {best * 1000:>8.1f} {str(results[0]['tensorflow']):>11} "
+              f"{str(results[0]['gemini']):>7}")
+
+
+if __name__ == "__main__":
+    main()
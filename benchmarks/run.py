@@ -0,0 +1,257 @@
+"""Benchmark the hot paths end to end on a synthetic corpus.
+
+Stages:
+    ingestion    get_channel_videos against an in-memory YouTube stub
+    sequences    prepare_sequences (dense) and prepare_stream
+    training     build_model + one fit per epoch on the streamed dataset
+                 (or fit_ngram with --backend ngram)
+    generation   generate_title per seed and batched generate_titles
+
+Each stage reports throughput, latency percentiles over its repeats and
+peak memory (traced Python allocations from a separate, untimed run, and
+the process's peak RSS after the stage). Results are printed as a table
+and optionally written as JSON so runs can be compared across commits.
+
+Usage:
+    python benchmarks/run.py [--titles 2000] [--stages ingestion sequences]
+                             [--output results.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import synthetic_titles, offline_predictor
+from stub_youtube import StubYouTubeClient
+from model import BACKENDS, new_tokenizer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES = ["ingestion", "sequences", "training", "generation"]
+
+
+def percentiles(samples):
+    """Return p50/p90/p99 and mean of a list of seconds, in milliseconds"""
+    import numpy as np
+
+    samples = np.asarray(samples) * 1000
+    return {
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p90_ms": float(np.percentile(samples, 90)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "mean_ms": float(samples.mean()),
+    }
+
+
+def timed(function, repeats):
+    """Call ``function`` ``repeats`` times; return (durations, last result)"""
+    durations = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return durations, result
+
+
+def traced_peak(function):
+    """Run ``function`` once under tracemalloc and return the peak in MiB"""
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def max_rss_mib():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2 ** 20 if sys.platform == "darwin" else rss / 2 ** 10
+
+
+def report(name, items, unit, durations, peak):
+    """Build one result record"""
+    total = sum(durations)
+    return dict(percentiles(durations), stage=name, items=items, unit=unit,
+                repeats=len(durations),
+                throughput=items * len(durations) / total if total else None,
+                peak_traced_mib=peak, max_rss_mib=max_rss_mib())
+
+
+def bench_ingestion(args):
+    from fetcher import ChannelFetcher, QuotaBudget, RateLimiter
+
+    stub = StubYouTubeClient(channels=1, videos_per_channel=args.titles,
+                             latency=args.latency, seed=args.seed)
+    predictor = offline_predictor()
+    # Unlimited quota and rate so only the client code path is measured
+    predictor.fetcher = ChannelFetcher(lambda: stub, max_workers=1,
+                                       quota=QuotaBudget(units=float("inf")),
+                                       rate_limiter=RateLimiter(rate=1e9),
+                                       max_videos=args.titles)
+    channel_id = f"UC{0:022d}"
+    fetch = lambda: predictor.get_channel_videos(channel_id)
+
+    durations, titles = timed(fetch, args.repeats)
+    return [report("ingestion", len(titles), "titles", durations, traced_peak(fetch))]
+
+
+def bench_sequences(args, titles):
+    def dense():
+        X, y, _ = offline_predictor().prepare_sequences(titles)
+        return len(y)
+
+    def streamed():
+        stream, _ = offline_predictor().prepare_stream(titles, batch_size=args.batch_size)
+        return sum(len(y) for _, y in stream.batches())
+
+    results = []
+    for name, function in (("sequences.dense", dense), ("sequences.stream", streamed)):
+        function()  # warm up lazily imported TensorFlow modules
+        durations, examples = timed(function, args.repeats)
+        results.append(report(name, examples, "examples", durations, traced_peak(function)))
+    return results
+
+
+def bench_ngram_training(args, titles):
+    predictor = offline_predictor()
+
+    def fit():
+        # Includes fitting the vocabulary, like train() does
+        predictor.tokenizer = new_tokenizer()
+        return predictor.fit_ngram(titles)
+
+    fit()  # warm up the lazily imported tokenizer
+    durations, _ = timed(fit, args.repeats)
+    examples = sum(len(tokens) for tokens in predictor.tokenizer.texts_to_sequences(titles)
+                   if len(tokens) > 1)
+    return [report("training.ngram", examples, "examples", durations, traced_peak(fit))], predictor
+
+
+def bench_training(args, titles):
+    if args.backend == "ngram":
+        return bench_ngram_training(args, titles)
+
+    from tensorflow.keras.callbacks import Callback
+
+    class EpochTimer(Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self.started = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            durations.append(time.perf_counter() - self.started)
+
+    predictor = offline_predictor()
+    stream, total_words = predictor.prepare_stream(titles, batch_size=args.batch_size)
+    durations = []
+    start = time.perf_counter()
+    predictor.build_model(total_words)
+    build_seconds = time.perf_counter() - start
+    predictor.model.fit(stream.dataset(), epochs=args.epochs, verbose=0,
+                        callbacks=[EpochTimer()])
+
+    result = report("training", stream.num_examples, "examples", durations, None)
+    result["build_model_ms"] = build_seconds * 1000
+    return [result], predictor
+
+
+def bench_generation(args, predictor, titles):
+    seeds = [" ".join(title.split()[:2]) for title in titles[:args.generate_seeds]]
+    predictor.generate_title(seeds[0], args.next_words)  # build the engine
+
+    seed_cycle = itertools.cycle(seeds)
+    single = lambda: predictor.generate_title(next(seed_cycle), args.next_words)
+    durations, _ = timed(single, args.repeats * len(seeds))
+    results = [report("generation.single", 1, "titles", durations,
+                      traced_peak(single))]
+
+    batched = lambda: predictor.generate_titles(seeds, args.next_words)
+    durations, _ = timed(batched, args.repeats)
+    results.append(report("generation.batched", len(seeds), "titles", durations,
+                          traced_peak(batched)))
+    return results
+
+
+def environment():
+    """Describe the machine and code version the results were measured on"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    info = {"commit": commit, "python": platform.python_version(),
+            "platform": platform.platform(), "cpu_count": os.cpu_count()}
+    if "tensorflow" in sys.modules:
+        info["tensorflow"] = sys.modules["tensorflow"].__version__
+    return info
+
+
+def run(args):
+    titles = synthetic_titles(args.titles, seed=args.seed)
+    results = []
+    if "ingestion" in args.stages:
+        results += bench_ingestion(args)
+    if "sequences" in args.stages:
+        results += bench_sequences(args, titles)
+    if "training" in args.stages or "generation" in args.stages:
+        training, predictor = bench_training(args, titles)
+        if "training" in args.stages:
+            results += training
+        if "generation" in args.stages:
+            results += bench_generation(args, predictor, titles)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=2000, help="synthetic corpus size")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--backend", choices=BACKENDS, default="lstm",
+                        help="model type for the training and generation stages")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--next-words", type=int, default=6)
+    parser.add_argument("--generate-seeds", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="simulated YouTube API round trip in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None
+
+    # The predictor writes its corpus, caches and models to the working directory
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            results = run(args)
+        finally:
+            os.chdir(cwd)
+
+    print(f"{'stage':<20} {'items':>7} {'throughput/s':>13} {'p50 ms':>9} {'p99 ms':>9} "
+          f"{'traced MiB':>11} {'rss MiB':>8}")
+    for result in results:
+        traced = result["peak_traced_mib"]
+        print(f"{result['stage']:<20} {result['items']:>7} {result['throughput']:>13.1f} "
+              f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+              f"{'-' if traced is None else f'{traced:.1f}':>11} {result['max_rss_mib']:>8.0f}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({"environment": environment(), "arguments": vars(args),
+                       "results": results}, f, indent=2)
+        print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from synthetic import synthetic_titles
+
+
+class _Request:
+    def __init__(self, client, call_type, handler, params):
+        self.client = client
+        self.call_type = call_type
+        self.handler = handler
+        self.params = params
+
+    def execute(self):
+        with self.client.lock:
+            self.client.calls[self.call_type] = self.client.calls.get(self.call_type, 0) + 1
+        if self.client.latency:
+            time.sleep(self.client.latency)
+        return self.handler(**self.params)
+
+
+class _Resource:
+    def __init__(self, client, call_type, handler):
+        self.client = client
+        self.call_type = call_type
+        self.handler = handler
+
+    def list(self, **params):
+        return _Request(self.client, self.call_type, self.handler, params)
+
+
+class StubYouTubeClient:
+    """In-memory stand-in for the YouTube discovery client.
+
+    Serves ``search``, ``channels`` and ``playlistItems`` for synthetic
+    channels named ``channel-0``, ``channel-1``, ... with ``videos_per_channel``
+    uploads each (newest first, like real uploads playlists), and counts
+    calls per type. ``latency`` adds a fixed delay per request to mimic
+    network round trips.
+    """
+
+    def __init__(self, channels=10, videos_per_channel=200, latency=0.0, seed=0):
+        self.latency = latency
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.uploads = {}
+        for index in range(channels):
+            titles = synthetic_titles(videos_per_channel, seed=seed + index)
+            self.uploads[f"UC{index:022d}"] = []
+            for title in reversed(titles):
+                self.upload(f"UC{index:022d}", title)
+
+    def upload(self, channel_id, title):
+        """Publish a new video at the top of a channel's uploads playlist"""
+        videos = self.uploads[channel_id]
+        published = datetime(2024, 1, 1) + timedelta(hours=len(videos))
+        videos.insert(0, {"id": f"video-{channel_id[-4:]}-{len(videos)}", "title": title,
+                          "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ")})
+
+    def _search(self, q, **params):
+        if not q.startswith("channel-") or f"UC{int(q[8:]):022d}" not in self.uploads:
+            return {"items": []}
+        channel_id = f"UC{int(q[8:]):022d}"
+        return {"items": [{"id": {"channelId": channel_id},
+                           "snippet": {"channelId": channel_id, "title": q}}]}
+
+    def _channels(self, id, **params):
+        return {"items": [{"id": channel_id,
+                           "contentDetails": {"relatedPlaylists": {"uploads": "UU" + channel_id[2:]}}}
+                          for channel_id in id.split(",") if channel_id in self.uploads]}
+
+    def _playlist_items(self, playlistId, maxResults=50, pageToken=None, **params):
+        videos = self.uploads["UC" + playlistId[2:]]
+        start = int(pageToken or 0)
+        page = videos[start:start + maxResults]
+        response = {"items": [{"snippet": {"title": video["title"],
+                                           "publishedAt": video["publishedAt"],
+                                           "resourceId": {"videoId": video["id"]}},
+                               "contentDetails": {"videoId": video["id"],
+                                                  "videoPublishedAt": video["publishedAt"]}}
+                              for video in page]}
+        if start + maxResults < len(videos):
+            response["nextPageToken"] = str(start + maxResults)
+        return response
+
+    def search(self):
+        return _Resource(self, "search", self._search)
+
+    def channels(self):
+        return _Resource(self, "channels", self._channels)
+
+    def playlistItems(self):
+        return _Resource(self, "playlistItems", self._playlist_items)
@@ -0,0 +1,37 @@
+import os
+import random
+import sys
+
+# Allow running the benchmarks from the repository root or this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = (
+    "minecraft survival episode build tutorial how to make best ever review "
+    "unboxing vlog challenge funny moments gameplay part live stream top ten "
+    "tips tricks guide beginners pro epic fail win new update season house "
+    "world record speedrun hardcore mod pack secret base trap farm village"
+).split()
+
+
+def synthetic_titles(count, min_words=3, max_words=12, seed=0):
+    """Generate a reproducible corpus of YouTube-like titles"""
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+        for _ in range(count)
+    ]
+
+
+def offline_predictor():
+    """Create a YoutubeTitlePredictor that never talks to the YouTube API"""
+    from model import YoutubeTitlePredictor
+    return YoutubeTitlePredictor(None, youtube=object())
+
+
+def trained_predictor(count=200, epochs=5, seed=0):
+    """Train a small predictor on a synthetic corpus"""
+    predictor = offline_predictor()
+    X, y, total_words = predictor.prepare_sequences(synthetic_titles(count, seed=seed))
+    predictor.build_model(total_words)
+    predictor.model.fit(X, y, epochs=epochs, batch_size=32, verbose=0)
+    return predictor
@@ -0,0 +1,27 @@
+def training_callbacks(patience, monitor="val_loss"):
+    """Create Keras callbacks that stop training once ``monitor`` plateaus.
+
+    Training stops after ``patience`` epochs without improvement, and the
+    weights of the best epoch are restored when training ends, whether it
+    stopped early or ran all its epochs. The best weights are kept in
+    memory, so there is no checkpoint file to clean up.
+    """
+    # Imported lazily like the rest of TensorFlow
+    from tensorflow.keras.callbacks import Callback, EarlyStopping
+
+    class RestoreBestWeights(Callback):
+        def on_train_begin(self, logs=None):
+            self.best = float("inf")
+            self.best_weights = None
+
+        def on_epoch_end(self, epoch, logs=None):
+            value = (logs or {}).get(monitor)
+            if value is not None and value < self.best:
+                self.best = value
+                self.best_weights = self.model.get_weights()
+
+        def on_train_end(self, logs=None):
+            if self.best_weights is not None:
+                self.model.set_weights(self.best_weights)
+
+    return [EarlyStopping(monitor=monitor, patience=patience), RestoreBestWeights()]
@@ -0,0 +1,133 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from file_lock import file_lock
+from config import CHANNEL_CACHE_PATH, CHANNEL_CACHE_TTL, CHANNEL_CACHE_SIZE
+
+CHANNEL_ID_PATTERN = re.compile(r"^UC[\w-]{22}$")
+
+
+def is_channel_id(value):
+    """Return True if ``value`` already looks like a YouTube channel ID"""
+    return bool(CHANNEL_ID_PATTERN.match(value.strip()))
+
+
+class ChannelResolutionCache:
+    """Channel name -> channel ID cache with TTL and LRU eviction.
+
+    Entries live in memory and are mirrored to a JSON file so they survive
+    Streamlit reruns and process restarts. Names are matched
+    case-insensitively. The app, training workers and CLIs share the file,
+    so each save merges in the entries other processes wrote, keeping the
+    newer resolution of every name.
+    """
+
+    def __init__(self, path=CHANNEL_CACHE_PATH, ttl=CHANNEL_CACHE_TTL,
+                 max_entries=CHANNEL_CACHE_SIZE):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(channel_name):
+        return " ".join(channel_name.lower().split())
+
+    def _read(self):
+        """Return the unexpired entries stored on disk"""
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        now = time.time()
+        return {name: (channel_id, stored_at)
+                for name, (channel_id, stored_at) in entries.items()
+                if now - stored_at < self.ttl}
+
+    def _load(self):
+        self._entries.update(self._read())
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            with file_lock(self.path + ".lock"):
+                disk = self._read()
+                # Entries only on disk go first, so ours stay most recently used
+                merged = OrderedDict((name, entry) for name, entry in disk.items()
+                                     if name not in self._entries)
+                for name, entry in self._entries.items():
+                    merged[name] = max(entry, disk.get(name, entry), key=lambda e: e[1])
+                while len(merged) > self.max_entries:
+                    merged.popitem(last=False)
+                self._entries = merged
+
+                directory = os.path.dirname(os.path.abspath(self.path))
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        json.dump(merged, f)
+                    os.replace(tmp_path, self.path)
+                except OSError:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+        except OSError:
+            pass
+
+    def get(self, channel_name):
+        """Return the cached channel ID for a name, or None if missing or expired"""
+        key = self._key(channel_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            channel_id, stored_at = entry
+            if time.time() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return channel_id
+
+    def put(self, channel_name, channel_id):
+        """Remember a resolved channel ID and persist the cache"""
+        key = self._key(channel_name)
+        with self._lock:
+            self._entries[key] = (channel_id, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def resolve(self, channel_name, lookup):
+        """Return a channel ID, calling ``lookup(channel_name)`` only on a cache miss"""
+        if is_channel_id(channel_name):
+            return channel_name.strip()
+        channel_id = self.get(channel_name)
+        if channel_id is None:
+            channel_id = lookup(channel_name)
+            self.put(channel_name, channel_id)
+        return channel_id
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache():
+    """Return the process-wide channel resolution cache"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ChannelResolutionCache()
+        return _default_cache
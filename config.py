@@ -31,7 +31,9 @@
 import os
 from dotenv import load_dotenv
 
-# Load environment variables
+# Load environment variables. This stays eager: METRICS_ENABLED below is read
+# from .env at import time, and once the standard library modules the other
+# modules import anyway are loaded, dotenv adds only ~10 ms
 load_dotenv()
 
 # API Keys
@@ -57,6 +59,76 @@ MAX_VIDEOS = 200
 EMBEDDING_DIM = 100
 DEFAULT_EPOCHS = 50
 DEFAULT_BATCH_SIZE = 32
+EARLY_STOPPING_PATIENCE = 3
+MAX_VOCAB_SIZE = None
+FINE_TUNE_REPLAY = 1.0
+
+# YouTube API Limits
+YOUTUBE_QUOTA_UNITS = 10000
+# The daily quota is shared by the app, training workers and CLIs through this file
+YOUTUBE_QUOTA_PERIOD = 24 * 60 * 60
+YOUTUBE_QUOTA_PATH = "youtube_quota.json"
+YOUTUBE_REQUESTS_PER_SECOND = 10
+FETCH_WORKERS = 8
 
 # Model Save Path
-MODEL_PATH = "saved_model"
\ No newline at end of file
+MODEL_PATH = "saved_model"
+MODEL_CHECK_INTERVAL = 5
+MODEL_MEMORY_BUDGET = 512 * 1024 * 1024
+MODEL_KEEP_VERSIONS = 3
+
+# Batch Generation
+BATCH_SIZE = 512
+
+# Gemini Response Cache
+GEMINI_CACHE_TTL = 24 * 60 * 60
+GEMINI_CACHE_SIZE = 1024
+GEMINI_CONCURRENCY = 4
+
+# Background Training Jobs
+JOBS_PATH = "jobs.db"
+TRAINING_WORKERS = 2
+JOB_POLL_INTERVAL = 2
+# Schedulers refresh their jobs' heartbeat this often; jobs silent for longer
+# than the timeout are considered orphaned by a dead process
+JOB_HEARTBEAT_INTERVAL = 10
+JOB_HEARTBEAT_TIMEOUT = 60
+
+# Title Corpus Cache
+CORPUS_PATH = "corpus.db"
+
+# Title Filtering and Deduplication
+TITLE_SKIP_PATTERNS = ['#shorts', '(live)', 'premiere']
+# Treat titles that differ only in an episode or part number (ep 12 / ep 13,
+# part 2 / part 3, #4 / #5) as duplicates; other numbers are kept
+DEDUP_MASK_NUMBERS = True
+# Minimum estimated Jaccard word similarity of a near duplicate (None disables)
+DEDUP_THRESHOLD = 0.8
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 16
+
+# Channel Name Resolution Cache
+CHANNEL_CACHE_PATH = "channel_cache.json"
+CHANNEL_CACHE_TTL = 7 * 24 * 60 * 60
+CHANNEL_CACHE_SIZE = 1024
+
+# Inference Server
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+SERVER_MAX_BATCH_SIZE = 64
+SERVER_MAX_WAIT_MS = 10
+
+# N-gram Backend
+NGRAM_ORDER = 3
+NGRAM_DISCOUNT = 0.75
+
+# Exported Inference Artifacts
+EXPORT_QUANTIZATION = "float16"
+MODEL_PREFER_EXPORTED = True
+
+# Training Dataset Shards
+SHARDS_PATH = "shards"
+SHARD_SIZE = 65536
+
+# Instrumentation (set METRICS_ENABLED=1 in .env to record timings and counters)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "").lower() in ("1", "true", "yes")
\ No newline at end of file
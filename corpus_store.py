@@ -0,0 +1,206 @@
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from fetcher import keep_title
+from metrics import timed
+from title_filter import TitleFilter
+from config import CORPUS_PATH, MAX_VIDEOS
+
+
+class CorpusStore:
+    """SQLite cache of channel upload titles keyed by channel ID.
+
+    Each video is stored once with its title and publish time. Refreshing a
+    channel pages its uploads playlist (newest first) only until the first
+    video that is already stored, so a channel that posted one video since
+    the last refresh costs a single ``playlistItems`` call.
+
+    Duplicate titles are only dropped when training, so a refresh also
+    backfills older pages until ``MAX_VIDEOS`` titles survive the title
+    filter. The page token to continue from is stored per channel, and a
+    channel is marked complete once its playlist runs out.
+    """
+
+    def __init__(self, path=CORPUS_PATH):
+        self.path = path
+        with closing(self._connect()) as db, db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS channels (
+                    channel_id TEXT PRIMARY KEY,
+                    playlist_id TEXT NOT NULL,
+                    refreshed_at REAL,
+                    backfill_token TEXT,
+                    complete INTEGER NOT NULL DEFAULT 0
+                )""")
+            # Corpora created before refreshes backfilled older pages
+            columns = {row[1] for row in db.execute("PRAGMA table_info(channels)")}
+            for column, kind in (("backfill_token", "TEXT"),
+                                 ("complete", "INTEGER NOT NULL DEFAULT 0")):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE channels ADD COLUMN {column} {kind}")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    channel_id TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    published_at TEXT,
+                    PRIMARY KEY (channel_id, video_id)
+                )""")
+            db.execute("""
+                CREATE INDEX IF NOT EXISTS videos_by_time
+                ON videos (channel_id, published_at DESC)""")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def playlist_id(self, channel_id):
+        """Return the stored uploads playlist ID for a channel, if any"""
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT playlist_id FROM channels WHERE channel_id = ?",
+                             (channel_id,)).fetchone()
+        return row[0] if row else None
+
+    def backfill_state(self, channel_id):
+        """Return (page token of the next older page, whether the playlist is exhausted)"""
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT backfill_token, complete FROM channels WHERE channel_id = ?",
+                             (channel_id,)).fetchone()
+        return (row[0], bool(row[1])) if row else (None, False)
+
+    def set_backfill_state(self, channel_id, page_token):
+        """Record where backfilling continues; no token means the playlist is exhausted"""
+        with closing(self._connect()) as db, db:
+            db.execute("""
+                UPDATE channels SET backfill_token = ?, complete = ?
+                WHERE channel_id = ?""", (page_token, page_token is None, channel_id))
+
+    def video_ids(self, channel_id):
+        """Return the set of stored video IDs for a channel"""
+        with closing(self._connect()) as db:
+            rows = db.execute("SELECT video_id FROM videos WHERE channel_id = ?",
+                              (channel_id,))
+            return {row[0] for row in rows}
+
+    def add_videos(self, channel_id, playlist_id, videos):
+        """Store new video records and mark the channel as refreshed"""
+        with closing(self._connect()) as db, db:
+            db.execute("""
+                INSERT INTO channels (channel_id, playlist_id, refreshed_at) VALUES (?, ?, ?)
+                ON CONFLICT (channel_id) DO UPDATE SET
+                    playlist_id = excluded.playlist_id,
+                    refreshed_at = excluded.refreshed_at""",
+                       (channel_id, playlist_id, time.time()))
+            db.executemany("""
+                INSERT OR REPLACE INTO videos (channel_id, video_id, title, published_at)
+                VALUES (?, ?, ?, ?)""",
+                           [(channel_id, video['video_id'], video['title'], video['published_at'])
+                            for video in videos])
+
+    def titles(self, channel_id, limit=MAX_VIDEOS, since=None):
+        """Return up to ``limit`` usable titles for a channel, newest first.
+
+        With ``since`` only titles published after that time are returned.
+        ``limit=None`` returns every stored title.
+        """
+        with closing(self._connect()) as db:
+            rows = db.execute("""
+                SELECT title FROM videos
+                WHERE channel_id = ? AND (? IS NULL OR published_at > ?)
+                ORDER BY published_at DESC, rowid""", (channel_id, since, since))
+            titles = []
+            for (title,) in rows:
+                if keep_title(title):
+                    titles.append(title)
+                    if limit is not None and len(titles) >= limit:
+                        break
+            return titles
+
+    def latest_published_at(self, channel_id):
+        """Return the publish time of the channel's newest stored video, if any"""
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT MAX(published_at) FROM videos WHERE channel_id = ?",
+                             (channel_id,)).fetchone()
+        return row[0]
+
+    @timed("corpus_refresh")
+    def refresh(self, channel_id, fetcher, title_filter=None, limit=MAX_VIDEOS,
+                playlist_id=None):
+        """Fetch new uploads, then backfill older ones; return how many were added.
+
+        Only videos newer than the newest stored one are fetched first.
+        Older pages are then fetched until ``limit`` stored titles survive
+        ``title_filter`` (a default ``TitleFilter`` if None) or the
+        playlist is exhausted.
+        """
+        playlist_id = self.playlist_id(channel_id) or playlist_id
+        if not playlist_id:
+            playlist_id = fetcher.uploads_playlists([channel_id]).get(channel_id)
+            if not playlist_id:
+                raise ValueError(f"Channel '{channel_id}' does not have any videos.")
+
+        added = 0
+        known = self.video_ids(channel_id)
+        if known:
+            videos = fetcher.playlist_videos(playlist_id, stop_at=known)
+            self.add_videos(channel_id, playlist_id, videos)
+            added += len(videos)
+
+        title_filter = title_filter or TitleFilter()
+        page_token, complete = self.backfill_state(channel_id)
+        while not complete:
+            kept, _ = title_filter.filter(self.titles(channel_id, limit=None), limit=limit)
+            if len(kept) >= limit:
+                break
+            # Fetch at least as many usable titles as are missing before filtering again
+            missing = limit - len(kept)
+            while missing > 0:
+                videos, page_token = fetcher.playlist_page(playlist_id, page_token)
+                self.add_videos(channel_id, playlist_id, videos)
+                self.set_backfill_state(channel_id, page_token)
+                added += len(videos)
+                missing -= sum(keep_title(video['title']) for video in videos)
+                if page_token is None:
+                    complete = True
+                    break
+        return added
+
+    def refresh_many(self, channel_names, fetcher, title_filter=None):
+        """Refresh many channels concurrently on ``fetcher.max_workers`` threads.
+
+        Returns ``(added, errors)``: the number of videos added and the
+        exception raised, keyed by channel name. Uploads playlists of
+        channels not stored yet are looked up 50 channels per request.
+        """
+        channel_names = list(dict.fromkeys(channel_names))
+        added, errors = {}, {}
+        title_filter = title_filter or TitleFilter()
+
+        with ThreadPoolExecutor(max_workers=fetcher.max_workers) as pool:
+            lookups = {name: pool.submit(fetcher.resolve_channel_id, name)
+                       for name in channel_names}
+            channel_ids = {}
+            for name, future in lookups.items():
+                try:
+                    channel_ids[name] = future.result()
+                except Exception as e:
+                    errors[name] = e
+
+            try:
+                playlists = fetcher.uploads_playlists(
+                    [channel_id for channel_id in channel_ids.values()
+                     if not self.playlist_id(channel_id)])
+            except Exception as e:
+                errors.update({name: e for name in channel_ids})
+                return added, errors
+
+            refreshes = {name: pool.submit(self.refresh, channel_id, fetcher, title_filter,
+                                           playlist_id=playlists.get(channel_id))
+                         for name, channel_id in channel_ids.items()}
+            for name, future in refreshes.items():
+                try:
+                    added[name] = future.result()
+                except Exception as e:
+                    errors[name] = e
+
+        return added, errors
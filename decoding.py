@@ -0,0 +1,238 @@
+import abc
+import numpy as np
+
+
+class Decoder(abc.ABC):
+    """Base class for decoding strategies used by ``YoutubeTitlePredictor``.
+
+    A decoder drives a ``TitleGenerationEngine``: every step it scores all
+    live hypotheses of all seeds with one batched forward pass and returns,
+    per seed, a list of ``(title, log_probability)`` ranked best first.
+    """
+
+    @abc.abstractmethod
+    def decode(self, engine, seed_texts, next_words=6):
+        """Return per seed a list of ``(title, log_probability)``, best first"""
+
+    @staticmethod
+    def log_probabilities(engine, windows):
+        """Score a batch of windows and return next-token log-probabilities.
+
+        Ids with no word (padding and unknown ids) are set to ``-inf`` except
+        id 0, which acts as the end-of-title token like in greedy decoding.
+        """
+        probabilities = engine.predict_proba(windows)[:, :len(engine.index_word)]
+        with np.errstate(divide="ignore"):
+            log_probs = np.log(probabilities)
+        no_word = engine.index_word[:log_probs.shape[1]] == ""
+        no_word[0] = False
+        log_probs[:, no_word] = -np.inf
+        return log_probs
+
+    @staticmethod
+    def advance(windows, tokens):
+        """Shift windows left and append ``tokens`` (0 leaves a window unchanged)"""
+        extend = tokens > 0
+        windows[extend, :-1] = windows[extend, 1:]
+        windows[extend, -1] = tokens[extend]
+
+    @staticmethod
+    def titles(engine, seed_texts, history):
+        """Turn per-hypothesis token histories into title strings"""
+        titles = []
+        for seed, tokens in zip(seed_texts, history):
+            words = engine.index_word[tokens[tokens > 0]]
+            titles.append(" ".join([seed] + list(words)))
+        return titles
+
+
+class GreedyDecoder(Decoder):
+    """Pick the most likely next word at every step"""
+
+    def decode(self, engine, seed_texts, next_words=6):
+        windows = engine.encode_seeds(seed_texts)
+        history = np.zeros((len(seed_texts), next_words), dtype=np.int64)
+        scores = np.zeros(len(seed_texts))
+        active = np.ones(len(seed_texts), dtype=bool)
+
+        for step in range(next_words):
+            if not active.any():
+                break
+            rows = np.flatnonzero(active)
+            log_probs = self.log_probabilities(engine, windows[rows])
+            tokens = np.argmax(log_probs, axis=-1)
+            tokens[~np.isfinite(log_probs[np.arange(len(rows)), tokens])] = 0
+
+            history[rows, step] = tokens
+            scores[rows] += np.where(tokens > 0, log_probs[np.arange(len(rows)), tokens], 0.0)
+            active[rows[tokens == 0]] = False
+            live_windows = windows[rows]
+            self.advance(live_windows, tokens)
+            windows[rows] = live_windows
+
+        titles = self.titles(engine, seed_texts, history)
+        return [[(title, float(score))] for title, score in zip(titles, scores)]
+
+
+class BeamSearchDecoder(Decoder):
+    """Keep the ``width`` best partial titles per seed.
+
+    All beams of all seeds are scored together, so each step is a single
+    forward pass over ``len(seed_texts) * width`` windows. Scores are summed
+    log-probabilities, optionally divided by ``length ** length_penalty``
+    when ranking finished candidates.
+    """
+
+    def __init__(self, width=5, length_penalty=0.0):
+        if width < 1:
+            raise ValueError("Beam width must be at least 1")
+        self.width = width
+        self.length_penalty = length_penalty
+
+    def decode(self, engine, seed_texts, next_words=6):
+        seeds, width = len(seed_texts), self.width
+        windows = np.repeat(engine.encode_seeds(seed_texts), width, axis=0)
+        history = np.zeros((seeds * width, next_words), dtype=np.int64)
+        lengths = np.zeros(seeds * width, dtype=np.int64)
+        finished = np.zeros(seeds * width, dtype=bool)
+
+        # Start with one live beam per seed so the first step does not pick duplicates
+        scores = np.full((seeds, width), -np.inf)
+        scores[:, 0] = 0.0
+
+        for step in range(next_words):
+            if finished.all():
+                break
+            log_probs = self.log_probabilities(engine, windows)
+            vocab_size = log_probs.shape[1]
+
+            # Finished beams may only continue with the end token at no cost
+            log_probs[finished] = -np.inf
+            log_probs[finished, 0] = 0.0
+
+            candidates = scores[:, :, None] + log_probs.reshape(seeds, width, vocab_size)
+            candidates = candidates.reshape(seeds, width * vocab_size)
+            top = np.argpartition(-candidates, width - 1, axis=1)[:, :width]
+            top_scores = np.take_along_axis(candidates, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            parents = (top // vocab_size + np.arange(seeds)[:, None] * width).ravel()
+            tokens = (top % vocab_size).ravel()
+
+            windows = windows[parents]
+            history = history[parents]
+            lengths = lengths[parents]
+            finished = finished[parents] | (tokens == 0)
+            history[:, step] = tokens
+            lengths += tokens > 0
+            scores = top_scores
+            self.advance(windows, tokens)
+
+        titles = self.titles(engine, np.repeat(seed_texts, width), history)
+        ranked = scores.ravel() / np.maximum(lengths, 1) ** self.length_penalty
+        results = []
+        for seed in range(seeds):
+            rows = range(seed * width, (seed + 1) * width)
+            candidates = {}
+            for row in sorted(rows, key=lambda r: -ranked[r]):
+                if np.isfinite(ranked[row]) and titles[row] not in candidates:
+                    candidates[titles[row]] = float(ranked[row])
+            results.append(list(candidates.items()))
+        return results
+
+
+class SamplingDecoder(Decoder):
+    """Draw ``num_samples`` titles per seed with temperature, top-k and top-p filtering.
+
+    Samples of all seeds advance together in one forward pass per step.
+    Candidates are ranked by their log-probability under the unfiltered
+    model distribution, with duplicate titles removed.
+    """
+
+    def __init__(self, num_samples=5, temperature=1.0, top_k=None, top_p=None, seed=None):
+        if temperature <= 0:
+            raise ValueError("Temperature must be positive")
+        if top_p is not None and not 0 < top_p <= 1:
+            raise ValueError("top_p must be in (0, 1]")
+        self.num_samples = num_samples
+        self.temperature = temperature
+        self.top_k = top_k
+        self.top_p = top_p
+        self.rng = np.random.default_rng(seed)
+
+    def filter_distribution(self, log_probs):
+        """Apply temperature, top-k and top-p to rows of log-probabilities"""
+        logits = log_probs / self.temperature
+        if self.top_k:
+            k = min(self.top_k, logits.shape[1])
+            kth = np.partition(logits, -k, axis=1)[:, -k][:, None]
+            logits = np.where(logits < kth, -np.inf, logits)
+
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+        if self.top_p is not None and self.top_p < 1:
+            order = np.argsort(-probabilities, axis=1)
+            sorted_probs = np.take_along_axis(probabilities, order, axis=1)
+            # Keep the smallest prefix whose mass reaches top_p
+            keep = np.cumsum(sorted_probs, axis=1) - sorted_probs < self.top_p
+            mask = np.zeros_like(keep)
+            np.put_along_axis(mask, order, keep, axis=1)
+            probabilities = np.where(mask, probabilities, 0.0)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+        return probabilities
+
+    def sample(self, probabilities):
+        """Draw one token per row by inverting the cumulative distribution"""
+        cumulative = np.cumsum(probabilities, axis=1)
+        draws = self.rng.random((len(probabilities), 1)) * cumulative[:, -1:]
+        return np.minimum((cumulative <= draws).sum(axis=1), probabilities.shape[1] - 1)
+
+    def decode(self, engine, seed_texts, next_words=6):
+        rows = len(seed_texts) * self.num_samples
+        windows = np.repeat(engine.encode_seeds(seed_texts), self.num_samples, axis=0)
+        history = np.zeros((rows, next_words), dtype=np.int64)
+        scores = np.zeros(rows)
+        active = np.ones(rows, dtype=bool)
+
+        for step in range(next_words):
+            if not active.any():
+                break
+            live = np.flatnonzero(active)
+            log_probs = self.log_probabilities(engine, windows[live])
+            tokens = self.sample(self.filter_distribution(log_probs))
+
+            history[live, step] = tokens
+            scores[live] += np.where(tokens > 0, log_probs[np.arange(len(live)), tokens], 0.0)
+            active[live[tokens == 0]] = False
+            live_windows = windows[live]
+            self.advance(live_windows, tokens)
+            windows[live] = live_windows
+
+        titles = self.titles(engine, np.repeat(seed_texts, self.num_samples), history)
+        results = []
+        for seed in range(len(seed_texts)):
+            start = seed * self.num_samples
+            candidates = {}
+            for row in sorted(range(start, start + self.num_samples), key=lambda r: -scores[r]):
+                candidates.setdefault(titles[row], float(scores[row]))
+            results.append(list(candidates.items()))
+        return results
+
+
+DECODERS = {
+    "greedy": GreedyDecoder,
+    "beam": BeamSearchDecoder,
+    "sampling": SamplingDecoder,
+}
+
+
+def get_decoder(name="greedy", **options):
+    """Create a decoder by name ("greedy", "beam" or "sampling")"""
+    if name not in DECODERS:
+        raise ValueError(f"Unknown decoder: {name}")
+    return DECODERS[name](**options)
@@ -0,0 +1,37 @@
+"""Export a channel's trained LSTM model to a quantized TFLite artifact.
+
+A new model version is published holding both ``model.h5`` and
+``model.tflite``; the model registry then serves the TFLite model for
+generation (see ``MODEL_PREFER_EXPORTED``). Run
+``benchmarks/bench_export.py`` to measure the speedup and accuracy change
+of each quantization mode.
+
+Usage:
+    python export.py --channel UC... [--quantization float16|int8|none]
+"""
+import argparse
+import os
+from config import YOUTUBE_API_KEY, EXPORT_QUANTIZATION
+from tflite_model import QUANTIZATIONS, TFLITE_FILE
+
+
+def main():
+    from model import YoutubeTitlePredictor
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channel", required=True, help="channel ID or name of the trained model")
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default=EXPORT_QUANTIZATION)
+    args = parser.parse_args()
+
+    predictor = YoutubeTitlePredictor(YOUTUBE_API_KEY)
+    version = predictor.export_model(args.channel, args.quantization)
+    path = predictor.model_store.current_path(predictor.channel_id)
+    sizes = {name: os.path.getsize(os.path.join(path, name)) / 2 ** 20
+             for name in ("model.h5", TFLITE_FILE)}
+    print(f"Published {version}: model.h5 {sizes['model.h5']:.1f} MiB, "
+          f"{TFLITE_FILE} {sizes[TFLITE_FILE]:.1f} MiB ({args.quantization})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from googleapiclient.errors import HttpError
+from channel_cache import is_channel_id
+from file_lock import file_lock
+from metrics import default_metrics
+from title_filter import skip_pattern
+from config import (
+    MAX_VIDEOS,
+    YOUTUBE_QUOTA_UNITS,
+    YOUTUBE_QUOTA_PERIOD,
+    YOUTUBE_QUOTA_PATH,
+    YOUTUBE_REQUESTS_PER_SECOND,
+    FETCH_WORKERS
+)
+
+# Quota cost of each YouTube Data API call type
+QUOTA_COSTS = {
+    "search": 100,
+    "channels": 1,
+    "playlistItems": 1,
+}
+
+SKIP_TITLE = skip_pattern()
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+
+
+class QuotaExceededError(Exception):
+    """Raised when a request would exceed the configured quota budget"""
+
+
+class QuotaBudget:
+    """Thread-safe counter of YouTube API quota units.
+
+    With ``period`` (seconds) set, the budget refills once that much time
+    has passed since the current window started, like the daily API quota.
+    With ``path`` set, the units spent are kept in that JSON file and
+    updated under a file lock, so the app, training workers and CLIs draw
+    on one budget.
+    """
+
+    def __init__(self, units=YOUTUBE_QUOTA_UNITS, period=None, path=None):
+        self.units = units
+        self.period = period
+        self.path = path
+        self.spent = 0
+        self.window_start = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self):
+        with self._lock:
+            if self.path:
+                self._read()
+            return self.units - self.spent
+
+    def _read(self):
+        """Load the units spent in the current window from the shared file"""
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+            self.spent, self.window_start = state["spent"], state["window_start"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _write(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"spent": self.spent, "window_start": self.window_start}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _reserve(self, units):
+        if self.period and time.time() - self.window_start >= self.period:
+            self.spent = 0
+            self.window_start = time.time()
+        if self.spent + units > self.units:
+            raise QuotaExceededError(
+                f"Quota budget exhausted ({self.spent}/{self.units} units used)")
+        self.spent += units
+
+    def spend(self, units):
+        """Reserve ``units`` or raise ``QuotaExceededError``"""
+        with self._lock:
+            if not self.path:
+                self._reserve(units)
+                return
+            with file_lock(self.path + ".lock"):
+                self._read()
+                self._reserve(units)
+                self._write()
+
+
+_default_quota = None
+_default_quota_lock = threading.Lock()
+
+
+def default_quota():
+    """Return the process-wide daily quota budget, shared with other processes"""
+    global _default_quota
+    with _default_quota_lock:
+        if _default_quota is None:
+            _default_quota = QuotaBudget(period=YOUTUBE_QUOTA_PERIOD, path=YOUTUBE_QUOTA_PATH)
+        return _default_quota
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiting requests per second"""
+
+    def __init__(self, rate=YOUTUBE_REQUESTS_PER_SECOND, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def is_retryable(error):
+    """Return True if an ``HttpError`` is transient and worth retrying"""
+    status = getattr(error.resp, "status", None)
+    if status in RETRY_STATUSES:
+        return True
+    if status == 403:
+        reasons = {detail.get("reason") for detail in (error.error_details or [])
+                   if isinstance(detail, dict)}
+        return bool(reasons & RETRY_REASONS)
+    return False
+
+
+def build_youtube_client(api_key):
+    """Build a YouTube Data API client without fetching the discovery document.
+
+    The v3 discovery document ships with google-api-python-client, so
+    ``static_discovery=True`` avoids a network round trip at startup.
+    """
+    from googleapiclient.discovery import build
+    return build('youtube', 'v3', developerKey=api_key, static_discovery=True)
+
+
+def keep_title(title):
+    """Return False for shorts, live streams and premieres"""
+    return not SKIP_TITLE.search(title)
+
+
+class ChannelFetcher:
+    """Fetch channel video titles from the YouTube Data API.
+
+    ``client_factory`` returns a YouTube discovery client (or a stub with
+    the same ``search``/``channels``/``playlistItems`` interface). One client
+    is created per worker thread because the default HTTP transport is not
+    thread-safe. All requests share one quota budget and rate limiter, and
+    transient ``HttpError`` responses are retried with exponential backoff.
+    Channel names are resolved through ``channel_cache`` when given, and
+    channel IDs are used as-is without a search call.
+    """
+
+    def __init__(self, client_factory, max_workers=FETCH_WORKERS, quota=None,
+                 rate_limiter=None, max_retries=5, backoff=1.0, max_videos=MAX_VIDEOS,
+                 channel_cache=None):
+        self.client_factory = client_factory
+        self.max_workers = max_workers
+        self.quota = quota or QuotaBudget()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_videos = max_videos
+        self.channel_cache = channel_cache
+        self._local = threading.local()
+
+    @property
+    def client(self):
+        """Return this thread's YouTube client"""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.client_factory()
+        return client
+
+    def execute(self, call_type, **params):
+        """Run one API call with quota accounting, rate limiting and retries"""
+        self.quota.spend(QUOTA_COSTS[call_type])
+        metrics = default_metrics()
+        metrics.increment("youtube_quota_units_total", QUOTA_COSTS[call_type], call_type=call_type)
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            metrics.increment("youtube_requests_total", call_type=call_type)
+            try:
+                return getattr(self.client, call_type)().list(**params).execute()
+            except HttpError as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                time.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+
+    def resolve_channel_id(self, channel_name):
+        """Return the channel ID for a channel name or ID, searching only on a cache miss"""
+        if self.channel_cache is not None:
+            return self.channel_cache.resolve(channel_name, self.search_channel_id)
+        if is_channel_id(channel_name):
+            return channel_name.strip()
+        return self.search_channel_id(channel_name)
+
+    def search_channel_id(self, channel_name):
+        """Look up a channel ID by name (costs a search call)"""
+        search_response = self.execute("search", q=channel_name, type="channel",
+                                       part="id", maxResults=1)
+        if not search_response.get('items'):
+            raise ValueError(f"Channel '{channel_name}' not found.")
+        return search_response['items'][0]['id']['channelId']
+
+    def uploads_playlists(self, channel_ids):
+        """Map channel IDs to uploads playlist IDs, 50 channels per request"""
+        playlists = {}
+        channel_ids = list(dict.fromkeys(channel_ids))
+        for i in range(0, len(channel_ids), 50):
+            channel_response = self.execute("channels", part="contentDetails",
+                                            id=",".join(channel_ids[i:i + 50]),
+                                            maxResults=50)
+            for item in channel_response.get('items', []):
+                playlists[item['id']] = item['contentDetails']['relatedPlaylists']['uploads']
+        return playlists
+
+    def playlist_page(self, playlist_id, page_token=None):
+        """Return one page of an uploads playlist as (video records, next page token)"""
+        playlist_response = self.execute("playlistItems", part="snippet,contentDetails",
+                                         playlistId=playlist_id, maxResults=50,
+                                         pageToken=page_token)
+        videos = []
+        for item in playlist_response['items']:
+            snippet = item['snippet']
+            videos.append({
+                'video_id': snippet['resourceId']['videoId'],
+                'title': snippet['title'],
+                # snippet.publishedAt is when the video was added to the playlist;
+                # private videos have no videoPublishedAt
+                'published_at': item.get('contentDetails', {}).get(
+                    'videoPublishedAt', snippet.get('publishedAt')),
+            })
+        return videos, playlist_response.get('nextPageToken')
+
+    def playlist_videos(self, playlist_id, stop_at=(), max_videos=None):
+        """Page through an uploads playlist (newest first) and return video records.
+
+        Paging stops at the first video ID in ``stop_at`` or once
+        ``max_videos`` usable titles have been seen.
+        """
+        max_videos = self.max_videos if max_videos is None else max_videos
+        videos = []
+        kept = 0
+        next_page_token = None
+
+        while True:
+            page, next_page_token = self.playlist_page(playlist_id, next_page_token)
+            for video in page:
+                if kept >= max_videos or video['video_id'] in stop_at:
+                    return videos
+                videos.append(video)
+                kept += keep_title(video['title'])
+
+            if not next_page_token or kept >= max_videos:
+                return videos
+
+    def playlist_titles(self, playlist_id):
+        """Page through an uploads playlist and return up to ``max_videos`` titles"""
+        return [video['title'] for video in self.playlist_videos(playlist_id)
+                if keep_title(video['title'])]
+
+    def fetch_channel(self, channel_name):
+        """Fetch video titles for a single channel name"""
+        channel_id = self.resolve_channel_id(channel_name)
+        playlist_id = self.uploads_playlists([channel_id]).get(channel_id)
+        if not playlist_id:
+            raise ValueError(f"Channel '{channel_name}' does not have any videos.")
+        return self.playlist_titles(playlist_id)
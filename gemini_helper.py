@@ -1,22 +1,120 @@
-import google.generativeai as genai
-from config import GEMINI_API_KEY
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from metrics import default_metrics, timed
+from config import (
+    GEMINI_API_KEY,
+    GEMINI_CACHE_TTL,
+    GEMINI_CACHE_SIZE,
+    GEMINI_CONCURRENCY
+)
+
+class ResponseCache:
+    """Content-addressed cache of Gemini responses with TTL and LRU eviction.
+
+    Responses are keyed by the SHA-256 of the prompt. Concurrent requests
+    for the same prompt are coalesced: the first caller runs the request
+    and the others wait for its result instead of sending duplicates.
+    """
+
+    def __init__(self, ttl=GEMINI_CACHE_TTL, max_entries=GEMINI_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(prompt):
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def _store(self, key, response):
+        self._entries[key] = (response, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def claim(self, prompt):
+        """Look up ``prompt`` and return ``(response, future, owner)``.
+
+        On a hit ``future`` is None. Otherwise ``future`` resolves to the
+        response of the request in flight; if ``owner`` is True the caller
+        must send that request and finish it with ``resolve`` or ``fail``.
+        """
+        key = self.key(prompt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                default_metrics().increment("gemini_cache_total", result="hit")
+                return entry[0], None, False
+            self._entries.pop(key, None)
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+
+        default_metrics().increment("gemini_cache_total", result="miss" if owner else "coalesced")
+        return None, future, owner
+
+    def resolve(self, prompt, future, response):
+        """Cache the response of a claimed request and hand it to waiting callers"""
+        key = self.key(prompt)
+        with self._lock:
+            self._store(key, response)
+            del self._in_flight[key]
+        future.set_result(response)
+
+    def fail(self, prompt, future, error):
+        """Release a claimed request that failed, raising ``error`` in waiting callers"""
+        with self._lock:
+            del self._in_flight[self.key(prompt)]
+        future.set_exception(error)
+
+    def get_or_compute(self, prompt, compute):
+        """Return the cached response for ``prompt`` or ``compute(prompt)`` it once"""
+        response, future, owner = self.claim(prompt)
+        if future is None:
+            return response
+        if not owner:
+            return future.result()
+
+        try:
+            response = compute(prompt)
+        except BaseException as e:
+            self.fail(prompt, future, e)
+            raise
+        self.resolve(prompt, future, response)
+        return response
+
 
 class GeminiTitleGenerator:
-    def __init__(self):
-        self.setup_gemini()
+    def __init__(self, model=None, cache=None):
+        """Initialize the generator; ``model`` may be any object with ``generate_content``"""
+        self.cache = cache or ResponseCache()
+        if model is None:
+            self.setup_gemini()
+        else:
+            self.model = model
         
     def setup_gemini(self):
         """Initialize Gemini API"""
         try:
+            # Imported lazily: the client library takes about a second to load
+            import google.generativeai as genai
             genai.configure(api_key=GEMINI_API_KEY)
             self.model = genai.GenerativeModel('gemini-pro')
         except Exception as e:
             raise Exception(f"Failed to initialize Gemini API: {str(e)}")
-    
-    def generate_clickbait_titles(self, title, channel_name):
-        """Generate clickbait titles in Hinglish"""
-        try:
-            prompt = f"""
+
+    @staticmethod
+    def build_prompt(title, channel_name):
+        """Build the clickbait prompt for a title and channel"""
+        return f"""
             Based on this YouTube title: "{title}"
             For YouTube channel: "{channel_name}"
             Generate 3 catchy clickbait titles in English.
@@ -28,9 +126,82 @@ class GeminiTitleGenerator:
             5. Format: Number each title (1., 2., 3.)
             6. And all the generated words should be witten in English alphabets.
             """
+
+    def _generate(self, prompt):
+        with default_metrics().span("gemini_request_seconds"):
+            return self.model.generate_content(prompt).text
+    
+    @timed("generate_clickbait_titles")
+    def generate_clickbait_titles(self, title, channel_name):
+        """Generate clickbait titles in Hinglish"""
+        try:
+            prompt = self.build_prompt(title, channel_name)
+            return self.cache.get_or_compute(prompt, self._generate)
             
-            response = self.model.generate_content(prompt)
-            return response.text
-            
         except Exception as e:
-            raise Exception(f"Error generating clickbait titles: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error generating clickbait titles: {str(e)}")
+
+    def stream_clickbait_titles(self, title, channel_name):
+        """Yield the clickbait titles text in chunks as Gemini produces it.
+
+        A cached response is yielded at once; otherwise the response is
+        streamed and cached once complete, so later calls (streaming or not)
+        reuse it. Identical calls made while it streams wait for the whole
+        response instead of sending their own request.
+        """
+        try:
+            prompt = self.build_prompt(title, channel_name)
+            response, future, owner = self.cache.claim(prompt)
+            if future is None:
+                yield response
+                return
+            if not owner:
+                yield future.result()
+                return
+
+            chunks = []
+            # Only time Gemini, not the consumer rendering each chunk
+            elapsed = 0.0
+            try:
+                start = time.perf_counter()
+                stream = iter(self.model.generate_content(prompt, stream=True))
+                while True:
+                    try:
+                        chunk = next(stream)
+                    except StopIteration:
+                        break
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    chunks.append(chunk.text)
+                    yield chunk.text
+                    start = time.perf_counter()
+            except GeneratorExit:
+                self.cache.fail(prompt, future, Exception("Streaming request was abandoned"))
+                raise
+            except BaseException as e:
+                self.cache.fail(prompt, future, e)
+                raise
+            default_metrics().observe("gemini_request_seconds", elapsed)
+            self.cache.resolve(prompt, future, "".join(chunks))
+
+        except Exception as e:
+            raise Exception(f"Error generating clickbait titles: {str(e)}")
+
+    async def generate_clickbait_titles_async(self, title, channel_name):
+        """Async variant of ``generate_clickbait_titles`` sharing its cache"""
+        return await asyncio.to_thread(self.generate_clickbait_titles, title, channel_name)
+
+    async def generate_many(self, titles, channel_name, concurrency=GEMINI_CONCURRENCY):
+        """Expand many titles concurrently, at most ``concurrency`` calls at a time.
+
+        Returns one result per title in input order; failed titles hold the
+        raised exception instead of a response.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def expand(title):
+            async with semaphore:
+                return await self.generate_clickbait_titles_async(title, channel_name)
+
+        return await asyncio.gather(*(expand(title) for title in titles),
+                                    return_exceptions=True)
@@ -0,0 +1,80 @@
+import numpy as np
+
+
+def build_index_word(tokenizer):
+    """Build an array-backed reverse vocabulary mapping token id -> word"""
+    return tokenizer.index_words()
+
+
+class TitleGenerationEngine:
+    """Greedy title decoder working on fixed-size rolling token windows.
+
+    Seeds are tokenized once; every step shifts each window left by one
+    position and writes the predicted id into the last slot, which is the
+    same input the model sees when the whole text is re-tokenized and
+    pre-padded. All active seeds are scored with one ``model.predict`` call
+    per generated word, and seeds with a smaller word limit simply drop out
+    of the batch once they reach it.
+    """
+
+    def __init__(self, model, tokenizer, max_sequence_len):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.window_len = max_sequence_len - 1
+        self.index_word = build_index_word(tokenizer)
+
+    def encode_seeds(self, seed_texts):
+        """Tokenize seeds into a pre-padded (N, window_len) id matrix"""
+        windows = np.zeros((len(seed_texts), self.window_len), dtype=np.int32)
+        ids, lengths = self.tokenizer.encode(seed_texts)
+
+        # Copy the last window_len ids of every seed into the end of its row
+        kept = np.minimum(lengths, self.window_len)
+        rows = np.repeat(np.arange(len(seed_texts)), kept)
+        positions = np.arange(kept.sum()) - np.repeat(np.cumsum(kept) - kept, kept)
+        sources = np.repeat(np.cumsum(lengths) - kept, kept) + positions
+        windows[rows, np.repeat(self.window_len - kept, kept) + positions] = ids[sources]
+        return windows
+
+    def predict_proba(self, windows):
+        """Return next-token probabilities for a batch of windows"""
+        return self.model.predict(windows, batch_size=len(windows), verbose=0)
+
+    def predict_next(self, windows):
+        """Return the most likely next token id for every window"""
+        return np.argmax(self.predict_proba(windows), axis=-1)
+
+    @staticmethod
+    def word_limits(seed_texts, next_words):
+        """Return one word limit per seed from a single limit or a sequence of them"""
+        return np.broadcast_to(np.asarray(next_words, dtype=np.int64), (len(seed_texts),))
+
+    def generate(self, seed_texts, next_words=6):
+        """Extend every seed text by up to ``next_words`` predicted words.
+
+        ``next_words`` is one limit for all seeds or a sequence with one
+        limit per seed.
+        """
+        windows = self.encode_seeds(seed_texts)
+        limits = self.word_limits(seed_texts, next_words)
+        words = [[] for _ in seed_texts]
+        active = np.arange(len(seed_texts))
+
+        for step in range(int(limits.max(initial=0))):
+            active = active[limits[active] > step]
+            if not len(active):
+                break
+
+            predicted = self.predict_next(windows[active])
+            output_words = self.index_word[np.minimum(predicted, len(self.index_word) - 1)]
+            found = (predicted < len(self.index_word)) & (output_words != "")
+
+            # Stop generating for seeds whose prediction has no word
+            active, predicted, output_words = active[found], predicted[found], output_words[found]
+
+            windows[active, :-1] = windows[active, 1:]
+            windows[active, -1] = predicted
+            for row, word in zip(active, output_words):
+                words[row].append(word)
+
+        return [" ".join([seed] + row_words) for seed, row_words in zip(seed_texts, words)]
@@ -0,0 +1,135 @@
+import numpy as np
+from tensorflow.keras.models import Model
+from tensorflow.keras.layers import Input, Embedding, LSTM, Dense
+from generation import TitleGenerationEngine
+
+
+def build_step_model(model):
+    """Build an inference-only copy of a trained title model that carries LSTM state.
+
+    The returned model takes ``[tokens, h1, c1, h2, ...]`` and returns
+    ``[probabilities, h1, c1, h2, ...]`` so the caller can feed one new
+    token at a time while keeping (h, c) for every LSTM layer. Dropout
+    layers are skipped since they are a no-op at inference time.
+    """
+    tokens = Input(shape=(None,), dtype="int32")
+    state_inputs = []
+    state_outputs = []
+    x = tokens
+    step_layers = []
+
+    for layer in model.layers:
+        if isinstance(layer, Embedding):
+            config = dict(layer.get_config(), input_length=None)
+            step_layer = Embedding.from_config(config)
+            x = step_layer(x)
+        elif isinstance(layer, LSTM):
+            config = dict(layer.get_config(), return_sequences=True,
+                          return_state=True, stateful=False)
+            step_layer = LSTM.from_config(config)
+            h = Input(shape=(layer.units,))
+            c = Input(shape=(layer.units,))
+            x, h_out, c_out = step_layer(x, initial_state=[h, c])
+            state_inputs += [h, c]
+            state_outputs += [h_out, c_out]
+        elif isinstance(layer, Dense):
+            step_layer = Dense.from_config(layer.get_config())
+            x = step_layer(x[:, -1, :])
+        else:
+            continue
+        step_layers.append((step_layer, layer))
+
+    step_model = Model([tokens] + state_inputs, [x] + state_outputs)
+    for step_layer, layer in step_layers:
+        step_layer.set_weights(layer.get_weights())
+    return step_model
+
+
+class IncrementalGenerationEngine(TitleGenerationEngine):
+    """Greedy title decoder that reuses cached LSTM states instead of full window passes.
+
+    The windowed decoder feeds ``max_sequence_len - 1`` positions per word,
+    most of which are leading zero padding. Since padding always comes
+    first, the state after ``k`` padding positions is the same for every
+    seed, so it is computed once per model. With ``exact=True`` (default)
+    each word starts from that cached padding state and only runs the real
+    tokens, which reproduces the windowed decoder token for token.
+
+    With ``exact=False`` the (h, c) states are carried forward so each word
+    costs a single recurrent step. The first word still matches the
+    windowed decoder, but later words can drift because the windowed
+    decoder re-pads (and eventually truncates) its input every step.
+    """
+
+    def __init__(self, model, tokenizer, max_sequence_len, exact=True):
+        super().__init__(model, tokenizer, max_sequence_len)
+        self.exact = exact
+        self.step_model = build_step_model(model)
+        self.state_sizes = [int(t.shape[-1]) for t in self.step_model.inputs[1:]]
+        self._padding_states = None
+
+    def step(self, tokens, states):
+        """Run ``tokens`` through the step model and return (probabilities, states)"""
+        outputs = self.step_model([tokens] + states, training=False)
+        return outputs[0].numpy(), [state.numpy() for state in outputs[1:]]
+
+    def initial_states(self, batch_size):
+        """Return zeroed (h, c) states for every LSTM layer"""
+        return [np.zeros((batch_size, size), dtype=np.float32) for size in self.state_sizes]
+
+    def padding_states(self, count, batch_size):
+        """Return the LSTM states after ``count`` leading padding positions"""
+        if self._padding_states is None:
+            states = self.initial_states(1)
+            self._padding_states = [states]
+            padding = np.zeros((1, 1), dtype=np.int32)
+            for _ in range(self.window_len):
+                _, states = self.step(padding, states)
+                self._padding_states.append(states)
+        return [np.repeat(state, batch_size, axis=0) for state in self._padding_states[count]]
+
+    def generate(self, seed_texts, next_words=6):
+        """Extend every seed text by up to ``next_words`` predicted words.
+
+        ``next_words`` is one limit for all seeds or a sequence with one
+        limit per seed.
+        """
+        windows = self.encode_seeds(seed_texts)
+        limits = self.word_limits(seed_texts, next_words)
+        lengths = np.count_nonzero(windows, axis=1)
+        words = [[] for _ in seed_texts]
+        active = np.arange(len(seed_texts))
+        tokens = windows
+        states = self.initial_states(len(seed_texts))
+
+        for step in range(int(limits.max(initial=0))):
+            # Seeds that reached their word limit leave the batch
+            running = limits[active] > step
+            active, tokens = active[running], tokens[running]
+            states = [state[running] for state in states]
+            if not len(active):
+                break
+
+            if self.exact:
+                # Only the trailing columns holding real tokens need a pass
+                span = max(1, int(lengths[active].max()))
+                tokens = windows[active, -span:]
+                states = self.padding_states(self.window_len - span, len(active))
+
+            probabilities, states = self.step(tokens, states)
+            predicted = np.argmax(probabilities, axis=-1)
+            output_words = self.index_word[np.minimum(predicted, len(self.index_word) - 1)]
+            found = (predicted < len(self.index_word)) & (output_words != "")
+
+            # Stop generating for seeds whose prediction has no word
+            active, predicted, output_words = active[found], predicted[found], output_words[found]
+            states = [state[found] for state in states]
+
+            windows[active, :-1] = windows[active, 1:]
+            windows[active, -1] = predicted
+            lengths[active] = np.minimum(lengths[active] + 1, self.window_len)
+            tokens = predicted.astype(np.int32)[:, None]
+            for row, word in zip(active, output_words):
+                words[row].append(word)
+
+        return [" ".join([seed] + row_words) for seed, row_words in zip(seed_texts, words)]
@@ -0,0 +1,45 @@
+"""Fill the title corpus for many channels without training.
+
+Channels are refreshed concurrently: new uploads are fetched, then older
+ones until ``MAX_VIDEOS`` titles survive the title filter. Later training
+runs for these channels only fetch uploads published since. All requests
+draw on the shared daily quota budget.
+
+Usage:
+    python ingest.py CHANNEL [CHANNEL ...] [--file channels.txt] [--workers 8]
+"""
+import argparse
+from config import YOUTUBE_API_KEY, FETCH_WORKERS
+from channel_cache import default_cache
+from corpus_store import CorpusStore
+from fetcher import ChannelFetcher, build_youtube_client, default_quota
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("channels", nargs="*", help="channel IDs or names")
+    parser.add_argument("--file", help="text file with one channel ID or name per line")
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS)
+    args = parser.parse_args()
+
+    channels = list(args.channels)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            channels += [line.strip() for line in f if line.strip()]
+    if not channels:
+        parser.error("no channels given")
+
+    fetcher = ChannelFetcher(lambda: build_youtube_client(YOUTUBE_API_KEY),
+                             max_workers=args.workers, quota=default_quota(),
+                             channel_cache=default_cache())
+    added, errors = CorpusStore().refresh_many(channels, fetcher)
+    for name, count in added.items():
+        print(f"{name}: {count} videos added")
+    for name, error in errors.items():
+        print(f"{name}: failed: {error}")
+    print(f"{fetcher.quota.remaining} quota units left")
+
+
+if __name__ == "__main__":
+    main()
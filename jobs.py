@@ -0,0 +1,345 @@
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+from metrics import default_metrics
+from config import JOBS_PATH, TRAINING_WORKERS, JOB_HEARTBEAT_INTERVAL, JOB_HEARTBEAT_TIMEOUT
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def process_owner():
+    """Identify this process as "host:pid" for the jobs it schedules"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def owner_alive(owner):
+    """Return False only if ``owner`` is a process on this host that has exited"""
+    host, _, pid = (owner or "").rpartition(":")
+    # On Windows os.kill terminates the process, so rely on heartbeats there
+    if host != socket.gethostname() or not pid.isdigit() or os.name != "posix":
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobStore:
+    """SQLite table of training jobs shared by the UI and worker processes"""
+
+    def __init__(self, path=JOBS_PATH):
+        self.path = path
+        with closing(self._connect()) as db, db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    channel TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    epoch INTEGER NOT NULL DEFAULT 0,
+                    epochs INTEGER NOT NULL,
+                    metrics TEXT,
+                    result TEXT,
+                    error TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    owner TEXT,
+                    heartbeat REAL
+                )""")
+            # Job stores created before jobs recorded their scheduling process
+            columns = {row[1] for row in db.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("heartbeat", "REAL")):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def create(self, channel, params, owner=None):
+        """Record a queued job for ``channel`` with ``train()`` keyword arguments.
+
+        Returns ``(job_id, created)``. If the channel already has an active
+        job, its ID is returned instead; the check and the insert share one
+        write transaction, so concurrent processes cannot both create one.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with closing(self._connect()) as db, db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("""
+                SELECT id FROM jobs WHERE channel = ? AND status IN (?, ?)
+                ORDER BY created_at DESC LIMIT 1""", (channel, *ACTIVE_STATUSES)).fetchone()
+            if row:
+                return row[0], False
+            db.execute("""
+                INSERT INTO jobs (id, channel, params, status, epochs, created_at, owner,
+                                  heartbeat)
+                VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)""",
+                       (job_id, channel, json.dumps(params), params["epochs"], now, owner, now))
+        return job_id, True
+
+    def update(self, job_id, **fields):
+        for key in ("params", "metrics", "result"):
+            if key in fields and fields[key] is not None:
+                fields[key] = json.dumps(fields[key])
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        with closing(self._connect()) as db, db:
+            db.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id):
+        """Return a job as a dict, or None if it does not exist"""
+        with closing(self._connect()) as db:
+            db.row_factory = sqlite3.Row
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        for key in ("params", "metrics", "result"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def active_job(self, channel):
+        """Return the queued or running job for a channel, if any"""
+        with closing(self._connect()) as db:
+            row = db.execute("""
+                SELECT id FROM jobs WHERE channel = ? AND status IN (?, ?)
+                ORDER BY created_at DESC LIMIT 1""", (channel, *ACTIVE_STATUSES)).fetchone()
+        return self.get(row[0]) if row else None
+
+    def fail(self, job_id, error):
+        """Mark a job as failed unless it has already finished"""
+        with closing(self._connect()) as db, db:
+            db.execute("""
+                UPDATE jobs SET status = 'failed', error = ?, finished_at = ?
+                WHERE id = ? AND status IN (?, ?)""",
+                       (error, time.time(), job_id, *ACTIVE_STATUSES))
+
+    def heartbeat(self, owner):
+        """Mark the active jobs scheduled by ``owner`` as still alive"""
+        with closing(self._connect()) as db, db:
+            db.execute("UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status IN (?, ?)",
+                       (time.time(), owner, *ACTIVE_STATUSES))
+
+    def fail_interrupted(self, timeout=JOB_HEARTBEAT_TIMEOUT):
+        """Mark active jobs whose scheduling process is gone as failed.
+
+        A job is orphaned when its owner is a process on this host that has
+        exited, or when its heartbeat is older than ``timeout`` seconds.
+        Jobs of other live schedulers (sessions or processes) are left alone.
+        """
+        now = time.time()
+        with closing(self._connect()) as db, db:
+            rows = db.execute("SELECT id, owner, heartbeat FROM jobs WHERE status IN (?, ?)",
+                              ACTIVE_STATUSES).fetchall()
+            orphaned = [(job_id,) for job_id, owner, heartbeat in rows
+                        if heartbeat is None or now - heartbeat > timeout
+                        or not owner_alive(owner)]
+            db.executemany("""
+                UPDATE jobs SET status = 'failed', error = 'Interrupted by restart',
+                                finished_at = ?
+                WHERE id = ? AND status IN (?, ?)""",
+                           [(now, job_id, *ACTIVE_STATUSES) for (job_id,) in orphaned])
+
+
+def channel_resolver():
+    """Return a function mapping channel names or IDs to channel IDs.
+
+    Names go through the shared channel cache, so a search call is only
+    made for names not resolved before.
+    """
+    from fetcher import ChannelFetcher, build_youtube_client, default_quota
+    from channel_cache import default_cache
+    from config import YOUTUBE_API_KEY
+
+    fetcher = ChannelFetcher(lambda: build_youtube_client(YOUTUBE_API_KEY), max_workers=1,
+                             quota=default_quota(), channel_cache=default_cache())
+    return fetcher.resolve_channel_id
+
+
+def _progress_callback(store, job_id):
+    """Create a Keras callback that records epoch progress and honours cancellation"""
+    from tensorflow.keras.callbacks import Callback
+
+    class JobProgress(Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            metrics = {key: float(value) for key, value in (logs or {}).items()}
+            store.update(job_id, epoch=epoch + 1, metrics=metrics)
+            if store.get(job_id)["cancel_requested"]:
+                self.model.stop_training = True
+
+    return JobProgress()
+
+
+def _init_worker(threads):
+    """Limit TensorFlow's thread pools so workers do not oversubscribe the CPU"""
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(max(1, threads // 2))
+
+
+def run_training_job(job_id, jobs_path):
+    """Train and save a channel model inside a worker process.
+
+    Returns the metrics recorded during the job, for the scheduling
+    process to merge into its own.
+    """
+    from model import YoutubeTitlePredictor
+    from config import YOUTUBE_API_KEY
+
+    # Workers are reused, so only report what this job recorded
+    metrics = default_metrics()
+    metrics.reset()
+    store = JobStore(jobs_path)
+    job = store.get(job_id)
+    if job["cancel_requested"]:
+        store.update(job_id, status="cancelled", finished_at=time.time())
+        return metrics.export()
+    store.update(job_id, status="running", started_at=time.time())
+
+    try:
+        predictor = YoutubeTitlePredictor(YOUTUBE_API_KEY)
+        titles, history = predictor.train(job["channel"],
+                                          callbacks=[_progress_callback(store, job_id)],
+                                          **job["params"])
+        if store.get(job_id)["cancel_requested"]:
+            store.update(job_id, status="cancelled", finished_at=time.time())
+            return metrics.export()
+
+        version = predictor.save_model()
+        result = {
+            "channel_id": predictor.channel_id,
+            "version": version,
+            "backend": predictor.backend,
+            "titles": titles[:5],
+            "num_titles": len(titles),
+            "filtered": predictor.filter_report.as_dict(),
+            "history": {key: [float(v) for v in values]
+                        for key, values in history.history.items()},
+        }
+        store.update(job_id, status="completed", result=result, finished_at=time.time())
+
+    except Exception as e:
+        store.update(job_id, status="failed", error=str(e), finished_at=time.time())
+    return metrics.export()
+
+
+class TrainingScheduler:
+    """Run training jobs in a pool of worker processes.
+
+    At most ``max_workers`` jobs train at once, each limited to its share of
+    the CPU cores; further jobs wait in the queue. A channel can only have
+    one active job, so submitting it again (by name or channel ID) returns
+    the existing job; jobs are keyed on the resolved channel ID. Job
+    state lives in a ``JobStore`` so any session (or a restarted process)
+    can poll it. Jobs record the scheduling process and a heartbeat it
+    refreshes every ``JOB_HEARTBEAT_INTERVAL`` seconds, so a new scheduler
+    only fails jobs whose scheduler has died. A job whose worker process
+    dies is failed as well, and the broken pool is replaced on the next
+    submit.
+    """
+
+    def __init__(self, jobs_path=JOBS_PATH, max_workers=TRAINING_WORKERS,
+                 heartbeat_interval=JOB_HEARTBEAT_INTERVAL, resolve_channel=None):
+        self.jobs_path = os.path.abspath(jobs_path)
+        self.resolve_channel = resolve_channel or channel_resolver()
+        self.store = JobStore(jobs_path)
+        self.store.fail_interrupted()
+        self.owner = process_owner()
+        self.max_workers = max_workers
+        self.pool = self._new_pool()
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(heartbeat_interval,), daemon=True,
+                         name="training-heartbeat").start()
+
+    def _new_pool(self):
+        threads = max(1, (os.cpu_count() or 1) // self.max_workers)
+        return ProcessPoolExecutor(max_workers=self.max_workers,
+                                   mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(threads,))
+
+    def _heartbeat(self, interval):
+        while not self._stopped.wait(interval):
+            try:
+                self.store.heartbeat(self.owner)
+            except sqlite3.Error:
+                pass
+
+    def submit(self, channel, epochs=50, batch_size=32, backend="lstm", warm_start=False):
+        """Queue a training job for a channel name or ID and return its job ID"""
+        channel_id = self.resolve_channel(channel)
+        with self._lock:
+            job_id, created = self.store.create(
+                channel_id, {"epochs": epochs, "batch_size": batch_size, "backend": backend,
+                             "warm_start": warm_start}, owner=self.owner)
+            if not created:
+                return job_id
+            try:
+                try:
+                    future = self.pool.submit(run_training_job, job_id, self.jobs_path)
+                except BrokenProcessPool:
+                    # A worker died and took the pool with it; start a fresh one
+                    self.pool.shutdown(wait=False, cancel_futures=True)
+                    self.pool = self._new_pool()
+                    future = self.pool.submit(run_training_job, job_id, self.jobs_path)
+            except Exception as e:
+                self.store.fail(job_id, f"Error submitting training job: {str(e)}")
+                raise
+            self._futures[job_id] = future
+        future.add_done_callback(lambda done: self._job_done(job_id, done))
+        return job_id
+
+    def _job_done(self, job_id, future):
+        """Merge the job's worker metrics, or fail it if the worker died before finishing"""
+        self._futures.pop(job_id, None)
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.store.fail(job_id, f"Training worker exited unexpectedly: "
+                                    f"{str(future.exception())}")
+            return
+        default_metrics().merge(future.result())
+
+    def status(self, job_id):
+        """Return the job record (status, epoch/epochs, metrics, result, error)"""
+        return self.store.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or ask a running job to stop after its current epoch"""
+        self.store.update(job_id, cancel_requested=1)
+        future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            self.store.update(job_id, status="cancelled", finished_at=time.time())
+
+    def shutdown(self):
+        self._stopped.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def default_scheduler():
+    """Return the process-wide training scheduler"""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = TrainingScheduler()
+        return _default_scheduler
@@ -0,0 +1,210 @@
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from config import METRICS_ENABLED
+
+PREFIX = "title_generator"
+# Histogram bucket upper bounds in seconds, from cached lookups to training runs
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60, 300, math.inf)
+
+# name -> (type, help) of every exported metric
+METRICS = {
+    "stage_seconds": ("histogram", "Duration of instrumented predictor and Gemini calls"),
+    "stage_errors_total": ("counter", "Instrumented calls that raised an exception"),
+    "youtube_requests_total": ("counter", "YouTube Data API requests by call type"),
+    "youtube_quota_units_total": ("counter", "YouTube Data API quota units spent by call type"),
+    "gemini_request_seconds": ("histogram", "Latency of Gemini API requests (cache misses)"),
+    "gemini_cache_total": ("counter", "Gemini response cache lookups by result"),
+    "model_cache_total": ("counter", "Model registry lookups by result (hit or miss)"),
+    "model_load_seconds": ("histogram", "Time to load a model from disk on a registry miss"),
+    "titles_removed_total": ("counter", "Titles dropped before training by reason"),
+}
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, as exported to Prometheus"""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+                break
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            total += count
+            yield bound, total
+
+
+class Metrics:
+    """Process-wide counters and latency histograms.
+
+    Samples are keyed by metric name plus label values and exported in the
+    Prometheus text format. When ``enabled`` is False, every recording
+    call returns immediately and ``timed`` functions call straight
+    through, so instrumentation costs one attribute check.
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        if name not in METRICS:
+            raise KeyError(f"Unknown metric '{name}'")
+        return name, tuple(sorted(labels.items()))
+
+    def increment(self, name, value=1, **labels):
+        """Add ``value`` to a counter"""
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """Record one duration in a histogram"""
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time the enclosed block into histogram ``name``"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, stage):
+        """Decorate a function to record its duration (and errors) under ``stage``"""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                except BaseException:
+                    self.increment("stage_errors_total", stage=stage)
+                    raise
+                finally:
+                    self.observe("stage_seconds", time.perf_counter() - start, stage=stage)
+            return wrapper
+        return decorator
+
+    def export(self):
+        """Return every sample as JSON-serializable data for ``merge``"""
+        with self._lock:
+            return {
+                "counters": [[name, list(labels), value]
+                             for (name, labels), value in self._counters.items()],
+                "histograms": [[name, list(labels), list(h.buckets), h.count, h.sum]
+                               for (name, labels), h in self._histograms.items()],
+            }
+
+    def merge(self, exported):
+        """Add samples exported by another process, such as a training worker"""
+        if not self.enabled or not exported:
+            return
+        with self._lock:
+            for name, labels, value in exported["counters"]:
+                key = self._key(name, dict(labels))
+                self._counters[key] = self._counters.get(key, 0) + value
+            for name, labels, buckets, count, total in exported["histograms"]:
+                key = self._key(name, dict(labels))
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram()
+                histogram.buckets = [a + b for a, b in zip(histogram.buckets, buckets)]
+                histogram.count += count
+                histogram.sum += total
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """Return {"counters": [...], "timings": [...]} rows for display"""
+        with self._lock:
+            counters = [dict({"metric": name}, **dict(labels), value=value)
+                        for (name, labels), value in sorted(self._counters.items())]
+            timings = [dict({"metric": name}, **dict(labels), count=histogram.count,
+                            total_s=histogram.sum, mean_ms=histogram.sum / histogram.count * 1000)
+                       for (name, labels), histogram in sorted(self._histograms.items())]
+        return {"counters": counters, "timings": timings}
+
+    def prometheus(self):
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(h.cumulative()), h.count, h.sum)
+                          for key, h in self._histograms.items()}
+
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            full_name = f"{PREFIX}_{name}"
+            samples = counters if kind == "counter" else histograms
+            series = sorted((labels, value) for (metric, labels), value in samples.items()
+                            if metric == name)
+            if not series:
+                continue
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in series:
+                if kind == "counter":
+                    lines.append(f"{full_name}{format_labels(labels)} {value}")
+                    continue
+                buckets, count, total = value
+                for bound, cumulative in buckets:
+                    le = "+Inf" if bound == math.inf else repr(float(bound))
+                    lines.append(f"{full_name}_bucket{format_labels(labels + (('le', le),))} "
+                                 f"{cumulative}")
+                lines.append(f"{full_name}_sum{format_labels(labels)} {total}")
+                lines.append(f"{full_name}_count{format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+_default_metrics = Metrics()
+
+
+def default_metrics():
+    """Return the process-wide metrics"""
+    return _default_metrics
+
+
+def timed(stage):
+    """Record a function's duration in the process-wide metrics under ``stage``"""
+    return _default_metrics.timed(stage)
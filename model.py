@@ -1,38 +1,91 @@
-import pandas as pd
-import numpy as np
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Embedding, LSTM, Dense, Dropout
+import math
 import pickle
 import os
+import random
+from generation import TitleGenerationEngine
+from decoding import Decoder, get_decoder
+from sequences import SequenceStream
+from callbacks import training_callbacks
+from fetcher import ChannelFetcher, build_youtube_client, default_quota
+from corpus_store import CorpusStore
+from channel_cache import default_cache
+from model_registry import ModelRegistry, default_registry
+from model_store import ModelStore, model_filename
+from ngram import NGramModel, NGRAM_FILE
+from tflite_model import TFLiteModel, TFLITE_FILE
+from vocabulary import Vocabulary, save_tokenizer, load_tokenizer, LEGACY_TOKENIZER_FILE
+from shards import ShardWriter, ShardedDataset
+from title_filter import TitleFilter
+from metrics import default_metrics, timed
 from config import (
     MAX_TITLE_LENGTH, 
-    MAX_VIDEOS, 
+    MAX_VIDEOS,
     EMBEDDING_DIM,
-    MODEL_PATH
+    MODEL_PATH,
+    NGRAM_ORDER,
+    EXPORT_QUANTIZATION,
+    EARLY_STOPPING_PATIENCE,
+    MAX_VOCAB_SIZE,
+    FINE_TUNE_REPLAY,
+    SHARDS_PATH,
+    SHARD_SIZE
 )
 
+# Model types a channel can be trained with
+BACKENDS = ("lstm", "ngram")
+
+def new_tokenizer(max_words=None):
+    """Create an empty vocabulary keeping at most ``max_words - 1`` words"""
+    return Vocabulary(num_words=max_words)
+
+
 class YoutubeTitlePredictor:
-    def __init__(self, api_key):
+    def __init__(self, api_key, youtube=None):
         """Initialize the YouTube Title Predictor"""
-        if not api_key:
+        if not api_key and youtube is None:
             raise ValueError("API key is required")
             
         try:
-            self.youtube = build('youtube', 'v3', 
-                               developerKey=api_key,
-                               static_discovery=False)
-            self.tokenizer = Tokenizer()
+            # The YouTube client is built on first use
+            self._api_key = api_key
+            self._youtube = youtube
+            self.tokenizer = None
             self.max_title_length = MAX_TITLE_LENGTH
             self.model = None
             self.max_sequence_len = None
+            self._engines = {}
+            # The shared discovery client is not thread-safe, so fetch serially
+            self.fetcher = ChannelFetcher(lambda: self.youtube, max_workers=1,
+                                          quota=default_quota(),
+                                          channel_cache=default_cache())
+            self.corpus = CorpusStore()
+            self.title_filter = TitleFilter()
+            # FilterReport of the last fetched title list
+            self.filter_report = None
+            self.model_store = ModelStore()
+            self.channel_id = None
+            # Publish time of the newest title the current model was trained on
+            self.trained_through = None
             self._create_model_directory()
         except Exception as e:
             raise Exception(f"Failed to initialize YouTube API: {str(e)}")
     
+    @property
+    def youtube(self):
+        """YouTube Data API client, built from the bundled discovery document"""
+        if self._youtube is None:
+            try:
+                self._youtube = build_youtube_client(self._api_key)
+            except Exception as e:
+                raise Exception(f"Failed to initialize YouTube API: {str(e)}")
+        return self._youtube
+
+    @property
+    def backend(self):
+        """Type of the current model, one of ``BACKENDS``"""
+        return "ngram" if isinstance(self.model, NGramModel) else "lstm"
+
     def _create_model_directory(self):
         """Create directory for saving model if it doesn't exist"""
         if not os.path.exists(MODEL_PATH):
@@ -41,93 +94,69 @@ class YoutubeTitlePredictor:
     def get_channel_id_from_name(self, channel_name):
         """Fetch the channel ID from the channel name"""
         try:
-            search_response = self.youtube.search().list(
-                part="snippet",
-                q=channel_name,
-                type="channel",
-                maxResults=1
-            ).execute()
-
-            if not search_response.get('items'):
-                raise ValueError(f"Channel not found: {channel_name}")
-
-            channel_id = search_response['items'][0]['snippet']['channelId']
-            return channel_id
+            return self.fetcher.resolve_channel_id(channel_name)
 
         except HttpError as e:
             raise Exception(f"YouTube API error: {str(e)}")
         except Exception as e:
             raise Exception(f"Error fetching channel ID: {str(e)}")
 
+    @timed("get_channel_videos")
     def get_channel_videos(self, channel_name):
-        """Fetch video titles from a YouTube channel using its name."""
+        """Fetch video titles from a YouTube channel using its name or ID."""
+        try:
+            return self.filter_titles(self.fetcher.fetch_channel(channel_name))
+
+        except HttpError as e:
+            raise Exception(f"YouTube API error: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error fetching videos: {str(e)}")
+
+    @timed("get_corpus_titles")
+    def get_corpus_titles(self, channel_name, refresh=True):
+        """Return channel titles from the local corpus, fetching only new uploads"""
         try:
-            # Search for the channel by name
-            search_response = self.youtube.search().list(
-                q=channel_name,
-                type="channel",
-                part="id",
-                maxResults=1
-            ).execute()
-
-            if not search_response.get('items'):
-                raise ValueError(f"Channel '{channel_name}' not found.")
-
-            channel_id = search_response['items'][0]['id']['channelId']
-
-            # Fetch channel's uploads playlist ID
-            channel_response = self.youtube.channels().list(
-                part="contentDetails",
-                id=channel_id
-            ).execute()
-
-            if not channel_response.get('items'):
-                raise ValueError(f"Channel '{channel_name}' does not have any videos.")
-
-            playlist_id = channel_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-
-            # Fetch video titles from the playlist
-            videos = []
-            next_page_token = None
-
-            while True:
-                playlist_response = self.youtube.playlistItems().list(
-                    part="snippet",
-                    playlistId=playlist_id,
-                    maxResults=50,
-                    pageToken=next_page_token
-                ).execute()
-
-                for item in playlist_response['items']:
-                    if len(videos) >= MAX_VIDEOS:
-                        return videos
-                    title = item['snippet']['title']
-                    if not any(skip in title.lower() for skip in ['#shorts', '(live)', 'premiere']):
-                        videos.append(title)
-
-                next_page_token = playlist_response.get('nextPageToken')
-                if not next_page_token or len(videos) >= MAX_VIDEOS:
-                    break
-
-            return videos
+            channel_id = self.fetcher.resolve_channel_id(channel_name)
+            if refresh:
+                self.corpus.refresh(channel_id, self.fetcher, title_filter=self.title_filter)
+            # Deduplicate before capping, so reuploads do not take up MAX_VIDEOS slots
+            return self.filter_titles(self.corpus.titles(channel_id, limit=None),
+                                      limit=MAX_VIDEOS)
 
         except HttpError as e:
             raise Exception(f"YouTube API error: {str(e)}")
         except Exception as e:
             raise Exception(f"Error fetching videos: {str(e)}")
 
+    def filter_titles(self, titles, limit=None):
+        """Normalize titles and drop skipped and (near-)duplicate ones.
+
+        Repeated titles, such as reuploads and numbered series episodes,
+        add n-gram prefixes to train on without adding anything to learn.
+        At most ``limit`` titles are returned. The counts removed are kept
+        in ``filter_report``.
+        """
+        titles, self.filter_report = self.title_filter.filter(titles, limit)
+        metrics = default_metrics()
+        for reason in ("skipped", "duplicates", "near_duplicates"):
+            metrics.increment("titles_removed_total", getattr(self.filter_report, reason),
+                              reason=reason)
+        return titles
 
     def prepare_sequences(self, titles):
         """Prepare sequences for training"""
+        from tensorflow.keras.preprocessing.sequence import pad_sequences
+
         try:
             # Fit tokenizer
+            if self.tokenizer is None:
+                self.tokenizer = new_tokenizer()
             self.tokenizer.fit_on_texts(titles)
-            total_words = len(self.tokenizer.word_index) + 1
+            total_words = self.tokenizer.size
             
             # Create sequences
             input_sequences = []
-            for title in titles:
-                token_list = self.tokenizer.texts_to_sequences([title])[0]
+            for token_list in self.tokenizer.texts_to_sequences(titles):
                 for i in range(1, len(token_list)):
                     n_gram_sequence = token_list[:i+1]
                     input_sequences.append(n_gram_sequence)
@@ -150,17 +179,51 @@ class YoutubeTitlePredictor:
         except Exception as e:
             raise Exception(f"Error preparing sequences: {str(e)}")
 
-    def build_model(self, total_words):
-        """Build the LSTM model"""
+    def prepare_stream(self, titles, batch_size=32):
+        """Prepare a lazily padded training stream instead of a dense matrix"""
         try:
+            # Fit tokenizer
+            if self.tokenizer is None:
+                self.tokenizer = new_tokenizer()
+            self.tokenizer.fit_on_texts(titles)
+            total_words = self.tokenizer.size
+
+            token_lists = self.tokenizer.texts_to_sequences(titles)
+            lengths = [len(tokens) for tokens in token_lists if len(tokens) > 1]
+            if not lengths:
+                raise ValueError("No valid sequences created from titles")
+
+            self.max_sequence_len = max(lengths)
+            stream = SequenceStream(token_lists, self.max_sequence_len,
+                                    batch_size=batch_size)
+
+            return stream, total_words
+
+        except Exception as e:
+            raise Exception(f"Error preparing sequences: {str(e)}")
+
+    def build_model(self, total_words, mixed_precision=False):
+        """Build the LSTM model.
+
+        With ``mixed_precision`` the layers compute in bfloat16, which is
+        faster on CPUs with native bfloat16 support; the output softmax
+        stays in float32 for numerically stable probabilities.
+        """
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import Embedding, LSTM, Dense, Dropout
+
+        try:
+            # Engines may be shared with the model registry, so start a fresh set
+            self._engines = {}
+            dtype = "mixed_bfloat16" if mixed_precision else None
             self.model = Sequential([ 
                 Embedding(total_words, EMBEDDING_DIM, 
-                         input_length=self.max_sequence_len-1),
-                LSTM(150, return_sequences=True),
-                Dropout(0.2),
-                LSTM(100),
-                Dropout(0.2),
-                Dense(total_words, activation='softmax')
+                         input_length=self.max_sequence_len-1, dtype=dtype),
+                LSTM(150, return_sequences=True, dtype=dtype),
+                Dropout(0.2, dtype=dtype),
+                LSTM(100, dtype=dtype),
+                Dropout(0.2, dtype=dtype),
+                Dense(total_words, activation='softmax', dtype="float32")
             ])
             
             self.model.compile(loss='sparse_categorical_crossentropy',
@@ -172,30 +235,194 @@ class YoutubeTitlePredictor:
         except Exception as e:
             raise Exception(f"Error building model: {str(e)}")
 
-    def train(self, channel_name, epochs=50, batch_size=32):
-        """Train the model on channel's video titles"""
+    def fit_ngram(self, titles, order=NGRAM_ORDER):
+        """Fit an n-gram model on titles in place of the LSTM; return its history"""
         try:
+            if self.tokenizer is None:
+                self.tokenizer = new_tokenizer()
+            self.tokenizer.fit_on_texts(titles)
+
+            self._engines = {}
+            self.model = NGramModel(self.tokenizer.size, order)
+            # Generation windows only need the n-gram context
+            self.max_sequence_len = max(order, 2)
+            return self.model.fit(self.tokenizer.texts_to_sequences(titles))
+
+        except Exception as e:
+            raise Exception(f"Error fitting n-gram model: {str(e)}")
+
+    def fine_tune_stream(self, channel_id, titles, batch_size=32, replay=FINE_TUNE_REPLAY):
+        """Load the channel's saved LSTM and return a stream of titles it has not seen.
+
+        Titles published after the saved model was trained are mixed with
+        a random sample of ``replay`` times as many older titles, so the
+        model does not forget the rest of the channel. The saved vocabulary
+        and window length are kept; words new since then are skipped until
+        the next full retrain. Returns None if there is no LSTM to fine-tune.
+        """
+        entry = self.model_store.current_version(channel_id)
+        if not entry or entry.get("backend", "lstm") != "lstm" or not entry.get("trained_through"):
+            return None
+
+        # A private registry, since fitting changes the model's weights in place
+        loaded = ModelRegistry(prefer_exported=False).get_channel(channel_id, self.model_store)
+        if isinstance(loaded.model, TFLiteModel):
+            return None
+
+        # Only new titles that survived deduplication against the whole channel
+        kept = set(titles)
+        new_titles = [title for title in map(self.title_filter.normalize, self.corpus.titles(
+            channel_id, since=entry["trained_through"])) if title in kept]
+        if not new_titles:
+            raise ValueError("No new titles since the current model was trained")
+        new = set(new_titles)
+        old_titles = [title for title in titles if title not in new]
+        sample = random.sample(old_titles, min(len(old_titles),
+                                               math.ceil(len(new_titles) * replay)))
+
+        self._engines = {}
+        self.model = loaded.model
+        self.tokenizer = loaded.tokenizer
+        self.max_sequence_len = loaded.max_sequence_len
+        stream = SequenceStream(self.tokenizer.texts_to_sequences(new_titles + sample),
+                                self.max_sequence_len, batch_size=batch_size)
+        if not stream.num_examples:
+            raise ValueError("No valid sequences created from new titles")
+        return stream
+
+    @timed("train")
+    def train(self, channel_name, epochs=50, batch_size=32, callbacks=None, backend="lstm",
+              early_stopping=True, patience=EARLY_STOPPING_PATIENCE, max_words=MAX_VOCAB_SIZE,
+              warm_start=False, mixed_precision=False):
+        """Train the model on channel's video titles.
+
+        ``backend`` is "lstm" or "ngram"; the n-gram model trains in
+        milliseconds and ignores the epoch, batch and callback settings.
+
+        ``early_stopping`` stops once validation loss has not improved for
+        ``patience`` epochs and keeps the weights of the best epoch.
+        ``max_words`` caps the vocabulary, and with it the size of the
+        output layer, to the most frequent words. With ``warm_start`` the
+        channel's saved LSTM is fine-tuned on titles published since it was
+        trained (see ``fine_tune_stream``) instead of training from scratch.
+        """
+        try:
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown model backend '{backend}'")
+
             # Fetch and prepare data
-            titles = self.get_channel_videos(channel_name)
+            channel_id = self.fetcher.resolve_channel_id(channel_name)
+            titles = self.get_corpus_titles(channel_id)
             if len(titles) < 10:
                 raise ValueError("Not enough videos to train (minimum 10 required)")
             
-            X, y, total_words = self.prepare_sequences(titles)
-            
-            # Build and train model
-            self.build_model(total_words)
-            history = self.model.fit(X, y,
-                                   epochs=epochs,
-                                   batch_size=batch_size,
-                                   validation_split=0.1,
-                                   verbose=1)
+            self.channel_id = channel_id
+            self.trained_through = self.corpus.latest_published_at(channel_id)
+
+            if backend == "ngram":
+                self.tokenizer = new_tokenizer(max_words)
+                return titles, self.fit_ngram(titles)
             
-            return titles, history
+            stream = None
+            if warm_start:
+                stream = self.fine_tune_stream(channel_id, titles, batch_size=batch_size)
+            if stream is None:
+                # Each channel gets its own vocabulary
+                self.tokenizer = new_tokenizer(max_words)
+                stream, total_words = self.prepare_stream(titles, batch_size=batch_size)
+                self.build_model(total_words, mixed_precision)
+
+            return titles, self.fit_stream(stream, epochs, callbacks, early_stopping, patience)
             
         except Exception as e:
             raise Exception(f"Training error: {str(e)}")
 
-    def generate_title(self, seed_text, next_words=6):
+    def fit_stream(self, stream, epochs=50, callbacks=None, early_stopping=True,
+                   patience=EARLY_STOPPING_PATIENCE):
+        """Fit the current model on a ``SequenceStream`` or ``ShardedDataset``"""
+        train_stream, validation_stream = stream.split(0.1)
+        validation_data = validation_stream.dataset() if validation_stream.num_examples else None
+
+        callbacks = list(callbacks or [])
+        if early_stopping:
+            callbacks += training_callbacks(
+                patience, monitor="val_loss" if validation_data is not None else "loss")
+        
+        return self.model.fit(train_stream.dataset(),
+                              epochs=epochs,
+                              validation_data=validation_data,
+                              callbacks=callbacks,
+                              verbose=1)
+
+    def prepare_shards(self, titles_by_channel, directory=SHARDS_PATH, shard_size=SHARD_SIZE,
+                       max_words=MAX_VOCAB_SIZE):
+        """Tokenize and pad several channels' titles into on-disk training shards.
+
+        ``titles_by_channel`` is a list of title lists. One vocabulary is
+        fitted over all of them, then each list is written as its own
+        shards, so only one shard of padded examples is in memory at a
+        time. The vocabulary and window length are saved with the shards,
+        so ``train_on_shards`` can reuse them without re-tokenizing.
+        """
+        try:
+            titles_by_channel = [list(titles) for titles in titles_by_channel]
+            self.tokenizer = new_tokenizer(max_words)
+            for titles in titles_by_channel:
+                self.tokenizer.fit_on_texts(titles)
+
+            lengths = [self.tokenizer.encode(titles)[1] for titles in titles_by_channel]
+            self.max_sequence_len = int(max((length.max() for length in lengths if len(length)),
+                                            default=0))
+            if self.max_sequence_len < 2:
+                raise ValueError("No valid sequences created from titles")
+
+            writer = ShardWriter(directory, self.max_sequence_len, self.tokenizer.size, shard_size)
+            for titles in titles_by_channel:
+                writer.write(self.tokenizer.texts_to_sequences(titles))
+            save_tokenizer(self.tokenizer, directory)
+            writer.close()
+
+            return ShardedDataset(directory), self.tokenizer.size
+
+        except Exception as e:
+            raise Exception(f"Error preparing shards: {str(e)}")
+
+    @timed("train_on_shards")
+    def train_on_shards(self, directory=SHARDS_PATH, epochs=50, batch_size=32, callbacks=None,
+                        early_stopping=True, patience=EARLY_STOPPING_PATIENCE,
+                        mixed_precision=False):
+        """Train a new LSTM on shards written by ``prepare_shards``; return its history"""
+        try:
+            dataset = ShardedDataset(directory, batch_size=batch_size)
+            self.tokenizer = load_tokenizer(directory)
+            self.max_sequence_len = dataset.window_len + 1
+            self.channel_id = None
+            self.trained_through = None
+            self.build_model(self.tokenizer.size, mixed_precision)
+            return self.fit_stream(dataset, epochs, callbacks, early_stopping, patience)
+
+        except Exception as e:
+            raise Exception(f"Training error: {str(e)}")
+
+    def _get_engine(self, incremental=False):
+        """Return a generation engine bound to the current model and tokenizer"""
+        # N-gram models only look at a few tokens, so there is no state to carry,
+        # and exported models have no LSTM layers to rebuild a step model from
+        if incremental and not isinstance(self.model, (NGramModel, TFLiteModel)):
+            from incremental import IncrementalGenerationEngine
+            engine_class = IncrementalGenerationEngine
+        else:
+            engine_class = TitleGenerationEngine
+        engine = self._engines.get(engine_class)
+        if (engine is None or engine.model is not self.model
+                or engine.tokenizer is not self.tokenizer
+                or engine.window_len != self.max_sequence_len - 1):
+            engine = engine_class(self.model, self.tokenizer, self.max_sequence_len)
+            self._engines[engine_class] = engine
+        return engine
+
+    @timed("generate_title")
+    def generate_title(self, seed_text, next_words=6, incremental=False):
         """Generate a new title based on seed text"""
         if not self.model or not self.tokenizer:
             raise Exception("Model not trained or loaded")
@@ -204,62 +431,146 @@ class YoutubeTitlePredictor:
             return "Error: Seed text cannot be empty"
 
         try:
-            generated_text = seed_text
+            return self._get_engine(incremental).generate([seed_text], next_words)[0]
 
-            for _ in range(next_words):
-                # Tokenize and pad sequence
-                token_list = self.tokenizer.texts_to_sequences([generated_text])[0]
-                token_list = pad_sequences([token_list],
-                                        maxlen=self.max_sequence_len-1,
-                                        padding='pre')
+        except Exception as e:
+            return f"Error generating title: {str(e)}"
 
-                # Predict next word
-                predicted = self.model.predict(token_list, verbose=0)
-                predicted = np.argmax(predicted, axis=-1)
+    @timed("generate_titles")
+    def generate_titles(self, seed_texts, next_words=6, incremental=False):
+        """Generate titles for many seeds with one batched predict per word.
 
-                # Convert prediction to word
-                output_word = ""
-                for word, index in self.tokenizer.word_index.items():
-                    if index == predicted:
-                        output_word = word
-                        break
+        ``next_words`` is one word count for all seeds or one per seed.
+        """
+        if not self.model or not self.tokenizer:
+            raise Exception("Model not trained or loaded")
 
-                if not output_word:
-                    break  # Stop generating if no word is found
+        try:
+            seed_texts = list(seed_texts)
+            valid = [i for i, seed in enumerate(seed_texts) if seed.strip()]
+            results = ["Error: Seed text cannot be empty"] * len(seed_texts)
 
-                generated_text += " " + output_word
+            if valid:
+                engine = self._get_engine(incremental)
+                limits = engine.word_limits(seed_texts, next_words)
+                generated = engine.generate([seed_texts[i] for i in valid], limits[valid])
+                for i, title in zip(valid, generated):
+                    results[i] = title
 
-            return generated_text
+            return results
 
         except Exception as e:
-            return f"Error generating title: {str(e)}"
+            raise Exception(f"Error generating titles: {str(e)}")
 
-    def save_model(self):
-        """Save the model and tokenizer"""
+    @timed("generate_candidates")
+    def generate_candidates(self, seed_texts, next_words=6, decoder="beam", **options):
+        """Generate ranked (title, score) candidates for one or many seeds.
+
+        ``decoder`` is a ``Decoder`` instance or one of "greedy", "beam" and
+        "sampling"; extra keyword arguments configure the named decoder
+        (e.g. ``width=5`` or ``top_p=0.9, temperature=0.8``).
+        """
+        if not self.model or not self.tokenizer:
+            raise Exception("Model not trained or loaded")
+
+        single = isinstance(seed_texts, str)
+        seed_texts = [seed_texts] if single else list(seed_texts)
+        if not all(seed.strip() for seed in seed_texts):
+            raise ValueError("Seed text cannot be empty")
+
+        try:
+            if not isinstance(decoder, Decoder):
+                decoder = get_decoder(decoder, **options)
+            candidates = decoder.decode(self._get_engine(), seed_texts, next_words)
+            return candidates[0] if single else candidates
+
+        except Exception as e:
+            raise Exception(f"Error generating candidates: {str(e)}")
+
+    @timed("save_model")
+    def save_model(self, channel_id=None):
+        """Save the model and tokenizer as a new version of the channel's model"""
         try:
             if not self.model:
                 raise ValueError("No model to save")
-                
-            self.model.save(f"{MODEL_PATH}/model.h5")
-            with open(f"{MODEL_PATH}/tokenizer.pkl", "wb") as f:
-                pickle.dump(self.tokenizer, f)
+
+            channel_id = channel_id or self.channel_id
+            if channel_id:
+                version = self.model_store.save(channel_id, self.model, self.tokenizer,
+                                                self.max_sequence_len, backend=self.backend,
+                                                trained_through=self.trained_through)
+                default_registry().invalidate_channel(channel_id)
+                return version
+
+            # Without a channel, fall back to the single shared model directory
+            filename = model_filename(self.model)
+            for stale in {"model.h5", NGRAM_FILE, TFLITE_FILE, LEGACY_TOKENIZER_FILE} - {filename}:
+                if os.path.exists(f"{MODEL_PATH}/{stale}"):
+                    os.remove(f"{MODEL_PATH}/{stale}")
+            self.model.save(f"{MODEL_PATH}/{filename}")
+            save_tokenizer(self.tokenizer, MODEL_PATH)
             with open(f"{MODEL_PATH}/max_sequence_len.pkl", "wb") as f:
                 pickle.dump(self.max_sequence_len, f)
+            default_registry().invalidate(MODEL_PATH)
                 
         except Exception as e:
             raise Exception(f"Error saving model: {str(e)}")
 
-    def load_model(self):
-        """Load the model and tokenizer"""
+    def export_model(self, channel_id=None, quantization=EXPORT_QUANTIZATION):
+        """Publish a new version of the channel's model with a TFLite inference artifact.
+
+        The current Keras model is exported if there is one (e.g. right after
+        training); otherwise the channel's saved Keras model is loaded. The
+        new version keeps ``model.h5`` so it can still be retrained.
+        """
         try:
-            if not os.path.exists(f"{MODEL_PATH}/model.h5"):
-                raise FileNotFoundError("No saved model found")
-                
-            self.model = load_model(f"{MODEL_PATH}/model.h5")
-            with open(f"{MODEL_PATH}/tokenizer.pkl", "rb") as f:
-                self.tokenizer = pickle.load(f)
-            with open(f"{MODEL_PATH}/max_sequence_len.pkl", "rb") as f:
-                self.max_sequence_len = pickle.load(f)
+            channel_id = channel_id or self.channel_id
+            if not channel_id:
+                raise ValueError("A channel is required to export a model")
+            channel_id = self.fetcher.resolve_channel_id(channel_id)
+
+            if (self.model is None or isinstance(self.model, TFLiteModel)
+                    or channel_id != self.channel_id):
+                # A private registry so the process-wide one keeps serving the exported model
+                registry = ModelRegistry(prefer_exported=False)
+                loaded = registry.get_channel(channel_id, self.model_store)
+                self.model = loaded.model
+                self.tokenizer = loaded.tokenizer
+                self.max_sequence_len = loaded.max_sequence_len
+                self._engines = {}
+                self.channel_id = channel_id
+                entry = self.model_store.current_version(channel_id) or {}
+                self.trained_through = entry.get("trained_through")
+            if isinstance(self.model, NGramModel):
+                raise ValueError("N-gram models are already lightweight and cannot be exported")
+
+            exported = TFLiteModel.convert(self.model, quantization)
+            version = self.model_store.save(channel_id, self.model, self.tokenizer,
+                                            self.max_sequence_len, exported=exported,
+                                            backend=self.backend, quantization=quantization,
+                                            trained_through=self.trained_through)
+            default_registry().invalidate_channel(channel_id)
+            return version
+
+        except Exception as e:
+            raise Exception(f"Error exporting model: {str(e)}")
+
+    @timed("load_model")
+    def load_model(self, channel_id=None):
+        """Load the model and tokenizer (shared process-wide through the model registry)"""
+        try:
+            channel_id = channel_id or self.channel_id
+            if channel_id:
+                channel_id = self.fetcher.resolve_channel_id(channel_id)
+                loaded = default_registry().get_channel(channel_id, self.model_store)
+                self.channel_id = channel_id
+            else:
+                loaded = default_registry().get(MODEL_PATH)
+
+            self.model = loaded.model
+            self.tokenizer = loaded.tokenizer
+            self.max_sequence_len = loaded.max_sequence_len
+            self._engines = loaded.engines
                 
         except Exception as e:
             raise Exception(f"Error loading model: {str(e)}")
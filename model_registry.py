@@ -0,0 +1,156 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from ngram import NGramModel, NGRAM_FILE
+from tflite_model import TFLiteModel, TFLITE_FILE
+from vocabulary import VOCAB_FILE, load_tokenizer, tokenizer_filename
+from metrics import default_metrics
+from config import MODEL_PATH, MODEL_CHECK_INTERVAL, MODEL_MEMORY_BUDGET, MODEL_PREFER_EXPORTED
+
+ARTIFACT_FILES = ("model.h5", VOCAB_FILE, "max_sequence_len.pkl")
+MODEL_FILES = (NGRAM_FILE, "model.h5", TFLITE_FILE)
+
+
+def artifact_files(path):
+    """Return the artifact files of the model saved at ``path`` (LSTM, n-gram or TFLite)"""
+    models = tuple(name for name in MODEL_FILES if os.path.exists(os.path.join(path, name)))
+    return (models or ARTIFACT_FILES[:1]) + (tokenizer_filename(path),) + ARTIFACT_FILES[2:]
+
+
+class LoadedModel:
+    """A trained model with its vocabulary, shared by every predictor in the process"""
+
+    def __init__(self, path, model, tokenizer, max_sequence_len, signature):
+        self.path = path
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_sequence_len = max_sequence_len
+        self.signature = signature
+        self.checked_at = time.monotonic()
+        self.nbytes = sum(weights.nbytes for weights in model.get_weights())
+        # Generation engines built for this model, shared like the model itself
+        self.engines = {}
+
+
+class ModelRegistry:
+    """Load each saved model once per process and reuse it across sessions.
+
+    A cached model is returned without touching disk for
+    ``check_interval`` seconds. After that the artifact files are stat'ed
+    and the model is reloaded only if their size or mtime changed. Saving a
+    model in this process calls ``invalidate`` so the next ``get`` reloads.
+
+    Models are kept in least-recently-used order and evicted once their
+    combined weight size exceeds ``memory_budget`` bytes (the most recently
+    used model is always kept).
+
+    With ``prefer_exported`` an exported ``model.tflite`` is loaded in place
+    of ``model.h5`` when a version has both.
+    """
+
+    def __init__(self, check_interval=MODEL_CHECK_INTERVAL, memory_budget=MODEL_MEMORY_BUDGET,
+                 prefer_exported=MODEL_PREFER_EXPORTED):
+        self.check_interval = check_interval
+        self.memory_budget = memory_budget
+        self.prefer_exported = prefer_exported
+        self._models = OrderedDict()
+        self._channel_paths = {}
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self):
+        """Total weight size of every cached model"""
+        return sum(loaded.nbytes for loaded in self._models.values())
+
+    @staticmethod
+    def signature(path):
+        """Return (size, mtime) of every artifact file, or None if any is missing"""
+        try:
+            return tuple((stat.st_size, stat.st_mtime_ns) for stat in
+                         (os.stat(os.path.join(path, name)) for name in artifact_files(path)))
+        except FileNotFoundError:
+            return None
+
+    def _load(self, path, signature):
+        exported = os.path.join(path, TFLITE_FILE)
+        if os.path.exists(os.path.join(path, NGRAM_FILE)):
+            model = NGramModel.load(os.path.join(path, NGRAM_FILE))
+        elif os.path.exists(exported) and (self.prefer_exported or
+                                           not os.path.exists(os.path.join(path, "model.h5"))):
+            model = TFLiteModel.load(exported)
+        else:
+            from tensorflow.keras.models import load_model
+            model = load_model(os.path.join(path, "model.h5"))
+        # Legacy pickled Keras tokenizers are converted on load
+        tokenizer = load_tokenizer(path)
+        with open(os.path.join(path, "max_sequence_len.pkl"), "rb") as f:
+            max_sequence_len = pickle.load(f)
+        return LoadedModel(path, model, tokenizer, max_sequence_len, signature)
+
+    def get(self, path=MODEL_PATH):
+        """Return the loaded model stored at ``path``, loading it if needed"""
+        with self._lock:
+            metrics = default_metrics()
+            loaded = self._models.get(path)
+            if loaded and time.monotonic() - loaded.checked_at < self.check_interval:
+                self._models.move_to_end(path)
+                self._evict()
+                metrics.increment("model_cache_total", result="hit")
+                return loaded
+
+            signature = self.signature(path)
+            if signature is None:
+                self._models.pop(path, None)
+                raise FileNotFoundError("No saved model found")
+
+            if loaded is None or loaded.signature != signature:
+                metrics.increment("model_cache_total", result="miss")
+                with metrics.span("model_load_seconds"):
+                    loaded = self._load(path, signature)
+                self._models[path] = loaded
+            else:
+                metrics.increment("model_cache_total", result="hit")
+            loaded.checked_at = time.monotonic()
+            self._models.move_to_end(path)
+            self._evict()
+            return loaded
+
+    def _evict(self):
+        while len(self._models) > 1 and self.nbytes > self.memory_budget:
+            self._models.popitem(last=False)
+
+    def get_channel(self, channel_id, store):
+        """Return the current model version of a channel in a ``ModelStore``"""
+        with self._lock:
+            entry = self._channel_paths.get(channel_id)
+            if entry and time.monotonic() - entry[1] < self.check_interval:
+                path = entry[0]
+            else:
+                path = store.current_path(channel_id)
+                self._channel_paths[channel_id] = (path, time.monotonic())
+            return self.get(path)
+
+    def invalidate(self, path=MODEL_PATH):
+        """Drop a cached model so the next ``get`` reloads it from disk"""
+        with self._lock:
+            self._models.pop(path, None)
+
+    def invalidate_channel(self, channel_id):
+        """Forget a channel's current version so the next lookup re-reads its manifest"""
+        with self._lock:
+            self._channel_paths.pop(channel_id, None)
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def default_registry():
+    """Return the process-wide model registry"""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry()
+        return _default_registry
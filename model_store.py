@@ -0,0 +1,153 @@
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import threading
+import time
+from ngram import NGramModel, NGRAM_FILE
+from tflite_model import TFLiteModel, TFLITE_FILE
+from vocabulary import save_tokenizer
+from file_lock import file_lock
+from config import MODEL_PATH, MODEL_KEEP_VERSIONS
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_LOCK_FILE = "manifest.lock"
+
+
+def channel_key(channel_id):
+    """Return a filesystem-safe directory name for a channel"""
+    return re.sub(r"[^\w-]", "_", channel_id.strip())
+
+
+def model_filename(model):
+    """Return the artifact file name for a Keras, n-gram or TFLite model"""
+    if isinstance(model, NGramModel):
+        return NGRAM_FILE
+    if isinstance(model, TFLiteModel):
+        return TFLITE_FILE
+    return "model.h5"
+
+
+def write_json_atomic(path, data):
+    """Write JSON to ``path`` via a temporary file and an atomic rename"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelStore:
+    """Per-channel, versioned model artifacts.
+
+    Layout::
+
+        MODEL_PATH/<channel>/manifest.json
+        MODEL_PATH/<channel>/v0001/model.h5          (ngram.npz for n-gram models)
+        MODEL_PATH/<channel>/v0001/vocab.npz         (tokenizer.pkl in older versions)
+        MODEL_PATH/<channel>/v0001/max_sequence_len.pkl
+        MODEL_PATH/<channel>/v0001/model.tflite      (optional exported artifact)
+
+    A version is written into a temporary directory and renamed into place,
+    then the manifest is atomically replaced to point at it. Readers
+    therefore only ever see complete versions, and published version
+    directories are never modified. Writers hold ``manifest.lock`` from
+    reading the manifest to replacing it, so training processes saving the
+    same channel at once get distinct versions and keep both entries.
+    """
+
+    def __init__(self, root=MODEL_PATH, keep_versions=MODEL_KEEP_VERSIONS):
+        self.root = root
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def channel_dir(self, channel_id):
+        return os.path.join(self.root, channel_key(channel_id))
+
+    def manifest_path(self, channel_id):
+        return os.path.join(self.channel_dir(channel_id), MANIFEST_FILE)
+
+    def manifest(self, channel_id):
+        """Return the channel manifest, or None if the channel has no saved model"""
+        try:
+            with open(self.manifest_path(channel_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def channels(self):
+        """Return the IDs of every channel with a saved model"""
+        channels = []
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name, MANIFEST_FILE)
+            if os.path.exists(path):
+                with open(path) as f:
+                    channels.append(json.load(f)["channel_id"])
+        return channels
+
+    def current_version(self, channel_id):
+        """Return the manifest entry of the channel's current version, or None"""
+        manifest = self.manifest(channel_id)
+        if not manifest:
+            return None
+        return next((entry for entry in manifest["versions"]
+                     if entry["version"] == manifest["current"]), None)
+
+    def current_path(self, channel_id):
+        """Return the artifact directory of the channel's current version"""
+        manifest = self.manifest(channel_id)
+        if not manifest:
+            raise FileNotFoundError(f"No saved model found for channel '{channel_id}'")
+        return os.path.join(self.channel_dir(channel_id), manifest["current"])
+
+    def save(self, channel_id, model, tokenizer, max_sequence_len, exported=None, **metadata):
+        """Publish a new model version for a channel and return its name.
+
+        ``exported`` is an optional ``TFLiteModel`` stored next to the model.
+        """
+        channel_dir = self.channel_dir(channel_id)
+        os.makedirs(channel_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=channel_dir, prefix=".tmp-")
+        try:
+            model.save(os.path.join(tmp_dir, model_filename(model)))
+            if exported is not None:
+                exported.save(os.path.join(tmp_dir, TFLITE_FILE))
+            save_tokenizer(tokenizer, tmp_dir)
+            with open(os.path.join(tmp_dir, "max_sequence_len.pkl"), "wb") as f:
+                pickle.dump(max_sequence_len, f)
+
+            with self._lock, file_lock(os.path.join(channel_dir, MANIFEST_LOCK_FILE)):
+                manifest = self.manifest(channel_id) or {"channel_id": channel_id, "versions": []}
+                number = max([entry["number"] for entry in manifest["versions"]], default=0)
+                while True:
+                    number += 1
+                    version = f"v{number:04d}"
+                    try:
+                        # Fails if another process published this version first
+                        os.rename(tmp_dir, os.path.join(channel_dir, version))
+                        break
+                    except OSError:
+                        if not os.path.exists(os.path.join(channel_dir, version)):
+                            raise
+
+                manifest["versions"].append(dict(metadata, version=version, number=number,
+                                                 created_at=time.time()))
+                manifest["current"] = version
+                stale = manifest["versions"][:-self.keep_versions] if self.keep_versions else []
+                manifest["versions"] = manifest["versions"][len(stale):]
+                write_json_atomic(self.manifest_path(channel_id), manifest)
+
+            for entry in stale:
+                shutil.rmtree(os.path.join(channel_dir, entry["version"]), ignore_errors=True)
+            return version
+
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
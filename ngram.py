@@ -0,0 +1,152 @@
+import numpy as np
+from config import NGRAM_ORDER, NGRAM_DISCOUNT
+
+NGRAM_FILE = "ngram.npz"
+TABLE_FIELDS = ("keys", "offsets", "next_ids", "counts", "totals")
+
+
+class NGramHistory:
+    """Keras-style training history (one entry per metric) for an n-gram fit"""
+
+    def __init__(self, history):
+        self.history = history
+
+
+class NGramModel:
+    """Count-based n-gram title model with interpolated absolute discounting.
+
+    For every order ``k`` the counts are stored in compact sorted arrays:
+    each context of ``k - 1`` token ids is packed into one int64 key, and
+    the words that followed it are stored CSR-style (``offsets`` into
+    ``next_ids``/``counts``). Id 0 doubles as the start-of-title padding
+    in contexts and as the end-of-title token in predictions.
+
+    ``predict`` takes the same pre-padded token windows as the LSTM and
+    returns next-token probabilities, so the generation engine and all
+    decoders work with either model.
+    """
+
+    def __init__(self, vocab_size, order=NGRAM_ORDER, discount=NGRAM_DISCOUNT):
+        if order < 1:
+            raise ValueError("N-gram order must be at least 1")
+        if vocab_size ** order >= 2 ** 63:
+            raise ValueError(f"Vocabulary of {vocab_size} words is too large for order {order}")
+        self.vocab_size = vocab_size
+        self.order = order
+        self.discount = discount
+        self.unigram = np.full(vocab_size, 1 / vocab_size, dtype=np.float32)
+        self.tables = {}
+
+    def _pack(self, contexts):
+        """Pack (N, k) context id rows into int64 keys"""
+        keys = np.zeros(len(contexts), dtype=np.int64)
+        for column in contexts.T:
+            keys = keys * self.vocab_size + column
+        return keys
+
+    def examples(self, token_lists):
+        """Return (contexts, targets) for every next-word prediction in the titles.
+
+        Like the LSTM training data, targets start at the second word; the
+        word after the last one is the end-of-title id 0.
+        """
+        width = self.order - 1
+        padded = [np.concatenate([np.zeros(width, dtype=np.int64), tokens, [0]])
+                  for tokens in token_lists if len(tokens) > 1]
+        if not padded:
+            return np.zeros((0, width), dtype=np.int64), np.zeros(0, dtype=np.int64)
+        flat = np.concatenate(padded)
+        starts = np.cumsum([0] + [len(row) for row in padded[:-1]])
+        positions = np.concatenate([start + np.arange(width + 1, len(row))
+                                    for start, row in zip(starts, padded)])
+        contexts = flat[positions[:, None] + np.arange(-width, 0)]
+        return contexts, flat[positions]
+
+    def fit(self, token_lists):
+        """Count n-grams in tokenized titles; return a history with loss/accuracy"""
+        contexts, targets = self.examples(token_lists)
+        if not len(targets):
+            raise ValueError("No valid sequences created from titles")
+
+        # Add-one smoothing keeps every word reachable at the lowest order
+        counts = np.bincount(targets, minlength=self.vocab_size)
+        self.unigram = ((counts + 1) / (counts.sum() + self.vocab_size)).astype(np.float32)
+
+        self.tables = {}
+        for k in range(2, self.order + 1):
+            pairs = self._pack(contexts[:, contexts.shape[1] - (k - 1):]) * self.vocab_size + targets
+            pairs, pair_counts = np.unique(pairs, return_counts=True)
+            keys, offsets = np.unique(pairs // self.vocab_size, return_index=True)
+            self.tables[k] = {
+                "keys": keys,
+                "offsets": np.append(offsets, len(pairs)).astype(np.int64),
+                "next_ids": (pairs % self.vocab_size).astype(np.int32),
+                "counts": pair_counts.astype(np.int32),
+                "totals": np.add.reduceat(pair_counts, offsets).astype(np.int32),
+            }
+
+        return NGramHistory(self.evaluate(contexts, targets))
+
+    def evaluate(self, contexts, targets, chunk_size=1024):
+        """Return cross-entropy loss and top-1 accuracy over (contexts, targets)"""
+        loss, correct = 0.0, 0
+        for start in range(0, len(targets), chunk_size):
+            probabilities = self.predict(contexts[start:start + chunk_size])
+            chunk_targets = targets[start:start + chunk_size]
+            loss -= np.log(probabilities[np.arange(len(chunk_targets)), chunk_targets]).sum()
+            correct += (probabilities.argmax(axis=-1) == chunk_targets).sum()
+        return {"loss": [float(loss / len(targets))],
+                "accuracy": [float(correct / len(targets))]}
+
+    def predict(self, windows, batch_size=None, verbose=0):
+        """Return next-token probabilities for a batch of pre-padded windows"""
+        windows = np.asarray(windows, dtype=np.int64)
+        width = self.order - 1
+        if windows.shape[1] < width:
+            windows = np.pad(windows, ((0, 0), (width - windows.shape[1], 0)))
+        probabilities = np.tile(self.unigram, (len(windows), 1))
+
+        for k in range(2, self.order + 1):
+            table = self.tables[k]
+            keys = self._pack(windows[:, windows.shape[1] - (k - 1):])
+            index = np.minimum(np.searchsorted(table["keys"], keys), len(table["keys"]) - 1)
+            rows = np.flatnonzero(table["keys"][index] == keys)
+            if not len(rows):
+                continue
+            context = index[rows]
+            totals = table["totals"][context].astype(np.float32)
+            starts = table["offsets"][context]
+            lengths = table["offsets"][context + 1] - starts
+
+            # Lower-order mass is scaled by the probability freed by discounting
+            probabilities[rows] *= (self.discount * lengths / totals)[:, None]
+            entries = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            probabilities[np.repeat(rows, lengths), table["next_ids"][entries]] += (
+                (table["counts"][entries] - self.discount) / np.repeat(totals, lengths))
+
+        return probabilities
+
+    def get_weights(self):
+        """Return every table array (used like Keras weights for memory accounting)"""
+        return [self.unigram] + [table[field] for table in self.tables.values()
+                                 for field in TABLE_FIELDS]
+
+    def save(self, path):
+        arrays = {"unigram": self.unigram,
+                  "params": np.array([self.vocab_size, self.order]),
+                  "discount": np.array(self.discount)}
+        for k, table in self.tables.items():
+            for field in TABLE_FIELDS:
+                arrays[f"{field}_{k}"] = table[field]
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            vocab_size, order = (int(value) for value in data["params"])
+            model = cls(vocab_size, order, float(data["discount"]))
+            model.unigram = data["unigram"]
+            model.tables = {k: {field: data[f"{field}_{k}"] for field in TABLE_FIELDS}
+                            for k in range(2, order + 1)}
+        return model
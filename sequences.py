@@ -0,0 +1,88 @@
+import numpy as np
+
+
+def batch_dataset(batches, time_steps):
+    """Wrap a generator function of int32 (X, y) batches in a prefetching ``tf.data.Dataset``"""
+    import tensorflow as tf
+
+    dataset = tf.data.Dataset.from_generator(
+        batches,
+        output_signature=(
+            tf.TensorSpec(shape=(None, time_steps), dtype=tf.int32),
+            tf.TensorSpec(shape=(None,), dtype=tf.int32),
+        ))
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+class SequenceStream:
+    """Lazily yield padded (X, y) training batches from tokenized titles.
+
+    Titles are stored once as a flat int32 token array. Each training
+    example (every prefix of every title, as built by ``prepare_sequences``)
+    is just the position of its target token plus the start of its title,
+    so memory grows with the number of tokens instead of
+    ``examples * max_sequence_len``. Windows are padded on the fly, one
+    batch at a time.
+    """
+
+    def __init__(self, token_lists, max_sequence_len, batch_size=32, shuffle=True, seed=None):
+        lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64,
+                              count=len(token_lists))
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        self.tokens = (np.concatenate(token_lists).astype(np.int32) if len(token_lists)
+                       else np.zeros(0, dtype=np.int32))
+
+        # One example per target token after the first token of each title
+        examples = np.maximum(lengths - 1, 0)
+        self.starts = np.repeat(offsets[:-1], examples).astype(np.int32)
+        self.targets = (self.starts + 1 + np.arange(examples.sum())
+                        - np.repeat(np.cumsum(examples) - examples, examples)).astype(np.int32)
+
+        self.window_len = max_sequence_len - 1
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        """Number of batches per epoch"""
+        return -(-len(self.targets) // self.batch_size)
+
+    @property
+    def num_examples(self):
+        return len(self.targets)
+
+    def split(self, validation_split):
+        """Split off the last ``validation_split`` of examples like ``Model.fit`` does"""
+        split_at = int(self.num_examples * (1 - validation_split))
+        train, validation = self._subset(slice(0, split_at)), self._subset(slice(split_at, None))
+        validation.shuffle = False
+        return train, validation
+
+    def _subset(self, selection):
+        subset = object.__new__(SequenceStream)
+        subset.__dict__.update(self.__dict__)
+        subset.starts = self.starts[selection]
+        subset.targets = self.targets[selection]
+        return subset
+
+    def make_batch(self, indices):
+        """Build the padded (X, y) arrays for the given example indices"""
+        targets, starts = self.targets[indices], self.starts[indices]
+        window_len = self.window_len
+        positions = targets[:, None] - window_len + np.arange(window_len)
+        X = np.where(positions >= starts[:, None],
+                     self.tokens[np.maximum(positions, 0)], 0).astype(np.int32)
+        return X, self.tokens[targets]
+
+    def batches(self):
+        """Yield (X, y) batches for one epoch"""
+        order = np.arange(self.num_examples)
+        if self.shuffle:
+            self.rng.shuffle(order)
+
+        for i in range(0, len(order), self.batch_size):
+            yield self.make_batch(order[i:i + self.batch_size])
+
+    def dataset(self):
+        """Wrap the stream in a prefetching ``tf.data.Dataset``"""
+        return batch_dataset(self.batches, self.window_len)
@@ -0,0 +1,244 @@
+"""HTTP inference server for title generation with dynamic micro-batching.
+
+Concurrent ``POST /generate`` requests for the same channel are collected
+into micro-batches (up to ``--max-batch-size`` requests or ``--max-wait-ms``
+after the first one arrives) and decoded with one batched predict per
+generated word. One warm model is kept per channel.
+
+Endpoints:
+    POST /generate  {"seed": "...", "channel": "UC...", "next_words": 6}
+    GET  /stats     latency percentiles and batch sizes per channel
+    GET  /metrics   stage timings, quota and cache counters (Prometheus text)
+    GET  /health
+
+Usage: python server.py [--port 8000] [--metrics]
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from metrics import default_metrics
+from config import (
+    YOUTUBE_API_KEY,
+    MAX_TITLE_LENGTH,
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_MAX_BATCH_SIZE,
+    SERVER_MAX_WAIT_MS
+)
+
+STATS_WINDOW = 10000
+
+
+class MicroBatcher:
+    """Collect generation requests for one channel and run them in batches"""
+
+    def __init__(self, predictor, channel=None, max_batch_size=SERVER_MAX_BATCH_SIZE,
+                 max_wait=SERVER_MAX_WAIT_MS / 1000):
+        self.predictor = predictor
+        self.channel = channel
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.latencies = deque(maxlen=STATS_WINDOW)
+        self.batch_sizes = deque(maxlen=STATS_WINDOW)
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, seed, next_words=6):
+        """Queue a seed and return a Future resolving to the generated title"""
+        future = Future()
+        self._queue.put((seed, next_words, future, time.perf_counter()))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            with self._stats_lock:
+                self.batch_sizes.append(len(batch))
+            try:
+                # Cheap when cached; picks up newly published model versions
+                self.predictor.load_model(self.channel)
+                # One decode for the whole batch; each seed stops at its own length
+                titles = self.predictor.generate_titles(
+                    [seed for seed, _, _, _ in batch],
+                    [next_words for _, next_words, _, _ in batch])
+                for (_, _, future, started), title in zip(batch, titles):
+                    with self._stats_lock:
+                        self.latencies.append(time.perf_counter() - started)
+                    future.set_result(title)
+            except Exception as e:
+                for _, _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self):
+        """Return latency percentiles (ms) and batch size statistics"""
+        with self._stats_lock:
+            latencies = np.array(self.latencies) * 1000
+            batch_sizes = np.array(self.batch_sizes)
+        return {
+            "requests": len(latencies),
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else None,
+            "batches": len(batch_sizes),
+            "mean_batch_size": float(batch_sizes.mean()) if len(batch_sizes) else None,
+            "max_batch_size": int(batch_sizes.max()) if len(batch_sizes) else None,
+        }
+
+
+class TitleServer(ThreadingHTTPServer):
+    """HTTP server holding one warm predictor and batcher per channel"""
+
+    daemon_threads = True
+    # Accept bursts of concurrent clients; the default backlog of 5 resets them
+    request_queue_size = 128
+
+    def __init__(self, address, predictor_factory, max_batch_size=SERVER_MAX_BATCH_SIZE,
+                 max_wait=SERVER_MAX_WAIT_MS / 1000):
+        super().__init__(address, TitleRequestHandler)
+        self.predictor_factory = predictor_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batchers = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def batcher(self, channel):
+        """Return the batcher for a channel, loading its model on first use.
+
+        The model is loaded outside the server lock, so a cold channel only
+        delays its own requests; concurrent first requests for the same
+        channel wait for one load.
+        """
+        with self._lock:
+            batcher = self.batchers.get(channel)
+            if batcher is not None:
+                return batcher
+            future = self._loading.get(channel)
+            owner = future is None
+            if owner:
+                future = self._loading[channel] = Future()
+
+        if not owner:
+            return future.result()
+        try:
+            predictor = self.predictor_factory()
+            predictor.load_model(channel)
+            batcher = MicroBatcher(predictor, channel, self.max_batch_size, self.max_wait)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[channel]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self.batchers[channel] = batcher
+            del self._loading[channel]
+        future.set_result(batcher)
+        return batcher
+
+    def stats(self):
+        """Return ``MicroBatcher.stats`` for every loaded channel"""
+        with self._lock:
+            batchers = list(self.batchers.items())
+        return {channel or "default": batcher.stats() for channel, batcher in batchers}
+
+
+class TitleRequestHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, status, text, content_type="text/plain; version=0.0.4"):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(200, self.server.stats())
+        elif self.path == "/metrics":
+            self._send_text(200, default_metrics().prometheus())
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/generate":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            seed = request["seed"]
+            if not isinstance(seed, str) or not seed.strip():
+                raise ValueError("Seed text cannot be empty")
+            next_words = int(request.get("next_words", 6))
+            if not 1 <= next_words <= MAX_TITLE_LENGTH:
+                raise ValueError(f"next_words must be between 1 and {MAX_TITLE_LENGTH}")
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": f"Invalid request: {str(e)}"})
+            return
+
+        try:
+            title = self.server.batcher(request.get("channel")).submit(seed, next_words).result()
+            self._send_json(200, {"title": title})
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the cost of small requests
+        pass
+
+
+def main():
+    from model import YoutubeTitlePredictor
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--max-batch-size", type=int, default=SERVER_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=SERVER_MAX_WAIT_MS)
+    parser.add_argument("--metrics", action="store_true",
+                        help="record stage timings and counters for GET /metrics")
+    args = parser.parse_args()
+    if args.metrics:
+        default_metrics().enabled = True
+
+    server = TitleServer((args.host, args.port),
+                         lambda: YoutubeTitlePredictor(YOUTUBE_API_KEY),
+                         args.max_batch_size, args.max_wait_ms / 1000)
+    print(f"Serving on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
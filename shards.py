@@ -0,0 +1,179 @@
+"""Pre-tokenized, padded training examples stored as memory-mapped shards.
+
+Build shards for one or more channels once, then train on them in any
+number of runs without fetching or re-tokenizing the titles:
+
+Usage:
+    python shards.py build shards/gaming --channels UC... UC... [--shard-size 65536]
+    python shards.py train shards/gaming --save-as UC... [--epochs 50]
+"""
+import argparse
+import json
+import os
+import re
+import numpy as np
+from sequences import SequenceStream, batch_dataset
+from model_store import write_json_atomic
+from config import SHARD_SIZE, DEFAULT_EPOCHS, DEFAULT_BATCH_SIZE
+
+SHARD_META_FILE = "shards.json"
+SHARD_FILE_PATTERN = re.compile(r"^[Xy]_\d+\.npy$")
+
+
+class ShardWriter:
+    """Write padded (X, y) training examples into fixed-dtype ``.npy`` shards.
+
+    Every call to ``write`` pads one batch of tokenized titles (e.g. one
+    channel) shard by shard, so at most ``shard_size`` padded examples are
+    in memory at once. Ids are stored as uint16 when the vocabulary fits,
+    halving the disk and page cache footprint. ``close`` writes the
+    ``shards.json`` index last, so a directory without it is incomplete.
+    """
+
+    def __init__(self, directory, max_sequence_len, vocab_size, shard_size=SHARD_SIZE):
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if SHARD_FILE_PATTERN.match(name) or name == SHARD_META_FILE:
+                os.remove(os.path.join(directory, name))
+
+        self.directory = directory
+        self.max_sequence_len = max_sequence_len
+        self.vocab_size = vocab_size
+        self.shard_size = shard_size
+        self.dtype = np.uint16 if vocab_size <= np.iinfo(np.uint16).max + 1 else np.int32
+        self.shards = []
+
+    def write(self, token_lists):
+        """Append the training examples of tokenized titles; return how many were written"""
+        stream = SequenceStream(token_lists, self.max_sequence_len,
+                                batch_size=self.shard_size, shuffle=False)
+        for X, y in stream.batches():
+            name = f"{len(self.shards):05d}"
+            np.save(os.path.join(self.directory, f"X_{name}.npy"), X.astype(self.dtype))
+            np.save(os.path.join(self.directory, f"y_{name}.npy"), y.astype(self.dtype))
+            self.shards.append({"name": name, "examples": len(y)})
+        return stream.num_examples
+
+    def close(self):
+        write_json_atomic(os.path.join(self.directory, SHARD_META_FILE), {
+            "max_sequence_len": self.max_sequence_len,
+            "vocab_size": self.vocab_size,
+            "dtype": np.dtype(self.dtype).name,
+            "num_examples": sum(shard["examples"] for shard in self.shards),
+            "shards": self.shards,
+        })
+
+
+class ShardedDataset:
+    """Yield shuffled (X, y) training batches from shards written by ``ShardWriter``.
+
+    Shards are opened with ``np.load(mmap_mode="r")``, so only the rows of
+    the current batch are paged in and corpora larger than RAM can be
+    trained on. Each epoch visits the shards in a new random order and
+    shuffles the rows within each shard; the rows of a batch are read in
+    sorted order to keep the reads sequential.
+    """
+
+    def __init__(self, directory, batch_size=32, shuffle=True, seed=None):
+        with open(os.path.join(directory, SHARD_META_FILE)) as f:
+            self.meta = json.load(f)
+        self.directory = directory
+        self.window_len = self.meta["max_sequence_len"] - 1
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        # (shard, first row, end row) ranges making up this dataset
+        self.segments = [(shard["name"], 0, shard["examples"]) for shard in self.meta["shards"]]
+        self._arrays = {}
+
+    def __len__(self):
+        """Number of batches per epoch"""
+        return sum(-(-(stop - start) // self.batch_size) for _, start, stop in self.segments)
+
+    @property
+    def num_examples(self):
+        return sum(stop - start for _, start, stop in self.segments)
+
+    def arrays(self, name):
+        """Return the memory-mapped (X, y) arrays of a shard"""
+        if name not in self._arrays:
+            self._arrays[name] = tuple(
+                np.load(os.path.join(self.directory, f"{array}_{name}.npy"), mmap_mode="r")
+                for array in ("X", "y"))
+        return self._arrays[name]
+
+    def split(self, validation_split):
+        """Split off the last ``validation_split`` of examples like ``Model.fit`` does"""
+        split_at = int(self.num_examples * (1 - validation_split))
+        train, validation = self._subset([]), self._subset([])
+        seen = 0
+        for name, start, stop in self.segments:
+            cut = start + min(max(split_at - seen, 0), stop - start)
+            if cut > start:
+                train.segments.append((name, start, cut))
+            if stop > cut:
+                validation.segments.append((name, cut, stop))
+            seen += stop - start
+        validation.shuffle = False
+        return train, validation
+
+    def _subset(self, segments):
+        subset = object.__new__(ShardedDataset)
+        subset.__dict__.update(self.__dict__)
+        subset.segments = segments
+        return subset
+
+    def batches(self):
+        """Yield int32 (X, y) batches for one epoch"""
+        segments = list(self.segments)
+        if self.shuffle:
+            self.rng.shuffle(segments)
+
+        for name, start, stop in segments:
+            X, y = self.arrays(name)
+            rows = np.arange(start, stop)
+            if self.shuffle:
+                self.rng.shuffle(rows)
+            for i in range(0, len(rows), self.batch_size):
+                indices = np.sort(rows[i:i + self.batch_size])
+                yield X[indices].astype(np.int32), y[indices].astype(np.int32)
+
+    def dataset(self):
+        """Wrap the shards in a prefetching ``tf.data.Dataset``"""
+        return batch_dataset(self.batches, self.window_len)
+
+
+def main():
+    from model import YoutubeTitlePredictor
+    from config import YOUTUBE_API_KEY
+
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="fetch, tokenize and pad channel titles into shards")
+    build.add_argument("directory")
+    build.add_argument("--channels", nargs="+", required=True, help="channel IDs or names")
+    build.add_argument("--shard-size", type=int, default=SHARD_SIZE,
+                       help="training examples per shard")
+    train = commands.add_parser("train", help="train an LSTM on existing shards and save it")
+    train.add_argument("directory")
+    train.add_argument("--save-as", required=True, help="channel ID to save the model under")
+    train.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS)
+    train.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    predictor = YoutubeTitlePredictor(YOUTUBE_API_KEY)
+    if args.command == "build":
+        dataset, total_words = predictor.prepare_shards(
+            [predictor.get_corpus_titles(channel) for channel in args.channels],
+            args.directory, shard_size=args.shard_size)
+        print(f"Wrote {dataset.num_examples} examples in {len(dataset.segments)} shards "
+              f"({total_words} words) to {args.directory}")
+    else:
+        predictor.train_on_shards(args.directory, epochs=args.epochs, batch_size=args.batch_size)
+        version = predictor.save_model(args.save_as)
+        print(f"Saved {version} for {args.save_as}")
+
+
+if __name__ == "__main__":
+    main()
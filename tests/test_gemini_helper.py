@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import gemini_helper
+from gemini_helper import GeminiTitleGenerator, ResponseCache
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Stands in for ``genai.GenerativeModel`` and counts ``generate_content`` calls"""
+
+    def __init__(self, release=None, fail=()):
+        self.calls = 0
+        self.release = release
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False):
+        with self._lock:
+            self.calls += 1
+        if self.release is not None:
+            self.release.wait(5)
+        if any(title in prompt for title in self.fail):
+            raise RuntimeError("quota exceeded")
+        text = f"1. {prompt.split(chr(34))[1]}!"
+        if stream:
+            return [Response(text[:4]), Response(text[4:])]
+        return Response(text)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(gemini_helper.time, "monotonic", clock)
+    return clock
+
+
+def test_cache_hit_skips_the_model():
+    model = FakeModel()
+    generator = GeminiTitleGenerator(model=model)
+
+    first = generator.generate_clickbait_titles("Epic build", "Crafters")
+    second = generator.generate_clickbait_titles("Epic build", "Crafters")
+
+    assert first == second == "1. Epic build!"
+    assert model.calls == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    model = FakeModel()
+    generator = GeminiTitleGenerator(model=model, cache=ResponseCache(ttl=60))
+
+    generator.generate_clickbait_titles("Epic build", "Crafters")
+    clock.now += 59
+    generator.generate_clickbait_titles("Epic build", "Crafters")
+    assert model.calls == 1
+
+    clock.now += 2
+    generator.generate_clickbait_titles("Epic build", "Crafters")
+    assert model.calls == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    model = FakeModel()
+    cache = ResponseCache(max_entries=2)
+    generator = GeminiTitleGenerator(model=model, cache=cache)
+
+    generator.generate_clickbait_titles("a", "c")
+    generator.generate_clickbait_titles("b", "c")
+    generator.generate_clickbait_titles("a", "c")  # "b" is now least recently used
+    generator.generate_clickbait_titles("d", "c")
+    assert model.calls == 3
+    assert len(cache._entries) == 2
+
+    generator.generate_clickbait_titles("a", "c")
+    assert model.calls == 3
+    generator.generate_clickbait_titles("b", "c")
+    assert model.calls == 4
+
+
+def test_concurrent_identical_calls_are_coalesced():
+    release = threading.Event()
+    model = FakeModel(release=release)
+    generator = GeminiTitleGenerator(model=model)
+    results = []
+
+    def call():
+        results.append(generator.generate_clickbait_titles("Epic build", "Crafters"))
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Give every thread time to find the request in flight before it completes
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert model.calls == 1
+    assert results == ["1. Epic build!"] * 8
+
+
+def test_generate_many_returns_exceptions_per_item():
+    model = FakeModel(fail=("Broken",))
+    generator = GeminiTitleGenerator(model=model)
+
+    results = asyncio.run(generator.generate_many(["Epic build", "Broken", "Epic build"],
+                                                  "Crafters", concurrency=2))
+
+    assert results[0] == results[2] == "1. Epic build!"
+    assert isinstance(results[1], Exception)
+    assert "quota exceeded" in str(results[1])
+
+
+def test_concurrent_streams_share_one_request():
+    release = threading.Event()
+    model = FakeModel(release=release)
+    generator = GeminiTitleGenerator(model=model)
+    results = []
+
+    def stream():
+        results.append("".join(generator.stream_clickbait_titles("Epic build", "Crafters")))
+
+    threads = [threading.Thread(target=stream) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert model.calls == 1
+    assert results == ["1. Epic build!"] * 4
+    assert generator.generate_clickbait_titles("Epic build", "Crafters") == "1. Epic build!"
+    assert model.calls == 1
+
+
+def test_abandoned_stream_releases_the_request():
+    model = FakeModel()
+    generator = GeminiTitleGenerator(model=model)
+
+    stream = generator.stream_clickbait_titles("Epic build", "Crafters")
+    next(stream)
+    stream.close()
+
+    assert generator.generate_clickbait_titles("Epic build", "Crafters") == "1. Epic build!"
+    assert model.calls == 2
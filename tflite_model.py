@@ -0,0 +1,81 @@
+import threading
+import numpy as np
+from config import EXPORT_QUANTIZATION
+
+TFLITE_FILE = "model.tflite"
+QUANTIZATIONS = ("none", "float16", "int8")
+
+
+class TFLiteModel:
+    """Inference-only title model exported to TensorFlow Lite.
+
+    The exported graph takes the same pre-padded token windows as the Keras
+    model and returns next-token probabilities, so the generation engine
+    and all decoders use it unchanged. Quantization shrinks the weights,
+    which are dominated by the final ``Dense(total_words)`` layer:
+    "float16" halves them, "int8" stores them as 8-bit integers with
+    float activations (dynamic range quantization).
+
+    A TFLite interpreter is not thread-safe, so ``predict`` runs under a
+    lock; the input tensor is only resized when the batch size changes.
+    """
+
+    def __init__(self, content, quantization=None):
+        self.content = bytes(content)
+        self.quantization = quantization
+        self._lock = threading.Lock()
+        self._interpreter = None
+        self._batch_size = None
+
+    @classmethod
+    def convert(cls, model, quantization=EXPORT_QUANTIZATION):
+        """Convert a trained Keras title model into a TFLite model"""
+        import tensorflow as tf
+
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}'")
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        # Fused LSTM kernels cover the model; Select TF ops are a fallback
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS,
+                                               tf.lite.OpsSet.SELECT_TF_OPS]
+        if quantization != "none":
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == "float16":
+            converter.target_spec.supported_types = [tf.float16]
+        return cls(converter.convert(), quantization)
+
+    def _prepare(self, batch_size):
+        if self._interpreter is None:
+            import tensorflow as tf
+            self._interpreter = tf.lite.Interpreter(model_content=self.content)
+            self._input = self._interpreter.get_input_details()[0]
+            self._output = self._interpreter.get_output_details()[0]
+        if batch_size != self._batch_size:
+            self._interpreter.resize_tensor_input(
+                self._input["index"], [batch_size, self._input["shape"][1]])
+            self._interpreter.allocate_tensors()
+            self._batch_size = batch_size
+
+    def predict(self, windows, batch_size=None, verbose=0):
+        """Return next-token probabilities for a batch of pre-padded windows"""
+        windows = np.asarray(windows)
+        with self._lock:
+            self._prepare(len(windows))
+            self._interpreter.set_tensor(self._input["index"],
+                                         windows.astype(self._input["dtype"]))
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output["index"]).copy()
+
+    def get_weights(self):
+        """Return the flatbuffer as one array (used for memory accounting)"""
+        return [np.frombuffer(self.content, dtype=np.uint8)]
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.content)
+
+    @classmethod
+    def load(cls, path, quantization=None):
+        with open(path, "rb") as f:
+            return cls(f.read(), quantization)
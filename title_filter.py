@@ -0,0 +1,169 @@
+import hashlib
+import re
+import unicodedata
+import numpy as np
+from config import (
+    TITLE_SKIP_PATTERNS,
+    DEDUP_MASK_NUMBERS,
+    DEDUP_THRESHOLD,
+    MINHASH_PERMUTATIONS,
+    MINHASH_BANDS
+)
+
+WHITESPACE = re.compile(r"\s+")
+WORD = re.compile(r"\w+")
+# A number following an episode or part marker, e.g. "ep. 12", "part 3", "#4"
+EPISODE_NUMBER = re.compile(r"(\b(?:ep|episode|part|pt)\b\.?\s*|#)\d+")
+
+
+def skip_pattern(patterns=TITLE_SKIP_PATTERNS):
+    """Compile title substrings to skip (shorts, live streams, ...) into one regex"""
+    return re.compile("|".join(re.escape(pattern) for pattern in patterns), re.IGNORECASE)
+
+
+class FilterReport:
+    """How many titles a ``TitleFilter`` pass kept and removed, by reason"""
+
+    def __init__(self, total=0, skipped=0, duplicates=0, near_duplicates=0):
+        self.total = total
+        self.skipped = skipped
+        self.duplicates = duplicates
+        self.near_duplicates = near_duplicates
+
+    @property
+    def removed(self):
+        return self.skipped + self.duplicates + self.near_duplicates
+
+    @property
+    def kept(self):
+        return self.total - self.removed
+
+    def as_dict(self):
+        return {"total": self.total, "kept": self.kept, "skipped": self.skipped,
+                "duplicates": self.duplicates, "near_duplicates": self.near_duplicates}
+
+    def __repr__(self):
+        return (f"FilterReport(kept {self.kept}/{self.total}: {self.skipped} skipped, "
+                f"{self.duplicates} duplicates, {self.near_duplicates} near-duplicates)")
+
+
+class TitleFilter:
+    """Normalize titles and drop skipped, duplicate and near-duplicate ones.
+
+    Titles are NFKC-normalized with whitespace collapsed. Titles matching
+    the compiled skip pattern are dropped. The rest are compared on a key
+    of their lowercased words. With ``mask_numbers`` the numbers after
+    episode and part markers are masked, so "Survival Ep. 12" and
+    "survival ep 13" share a key, while "Top 10 cars" and "Top 5 cars" do
+    not. Titles whose key was already seen are exact duplicates.
+
+    Near duplicates, such as reuploads with an extra word, are found with
+    MinHash over the key's words. Candidates are titles that collide in
+    any LSH band, and a candidate counts when its estimated Jaccard
+    similarity is at least ``threshold``. ``threshold=None`` turns this
+    off. Titles are processed in order, so with newest-first input the
+    newest copy of a title is kept.
+    """
+
+    def __init__(self, skip_patterns=TITLE_SKIP_PATTERNS, mask_numbers=DEDUP_MASK_NUMBERS,
+                 threshold=DEDUP_THRESHOLD, num_perm=MINHASH_PERMUTATIONS,
+                 bands=MINHASH_BANDS, seed=1):
+        if num_perm % bands:
+            raise ValueError("MinHash permutations must be a multiple of the band count")
+        self.skip = skip_pattern(skip_patterns)
+        self.mask_numbers = mask_numbers
+        self.threshold = threshold
+        self.bands = bands
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hash functions (a * h + b mod 2 ** 64) >> 32 with odd a
+        self.a = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64) * 2 + 1
+        self.b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        # Combines the rows of a band into one bucket key
+        self.band_mix = rng.integers(0, 1 << 63, size=num_perm // bands, dtype=np.uint64) * 2 + 1
+
+    @staticmethod
+    def normalize(title):
+        """Return the title in NFKC form with runs of whitespace collapsed"""
+        return WHITESPACE.sub(" ", unicodedata.normalize("NFKC", title)).strip()
+
+    def keep(self, title):
+        """Return False for titles matching the skip pattern"""
+        return not self.skip.search(title)
+
+    def words(self, title):
+        """Return the lowercased words used to compare titles"""
+        key = title.casefold()
+        if self.mask_numbers:
+            key = EPISODE_NUMBER.sub(r"\g<1>0", key)
+        return WORD.findall(key)
+
+    def signatures(self, word_sets):
+        """Return the (titles, num_perm) MinHash signatures of non-empty word sets"""
+        hashes = np.array([int.from_bytes(hashlib.blake2b(word.encode("utf-8"),
+                                                          digest_size=4).digest(), "little")
+                           for words in word_sets for word in words], dtype=np.uint64)
+        starts = np.cumsum([0] + [len(words) for words in word_sets[:-1]])
+        values = (hashes[:, None] * self.a + self.b) >> np.uint64(32)
+        return np.minimum.reduceat(values, starts, axis=0)
+
+    def near_duplicates(self, word_sets):
+        """Return a boolean mask of word sets that nearly duplicate an earlier kept one"""
+        duplicate = np.zeros(len(word_sets), dtype=bool)
+        rows = [i for i, words in enumerate(word_sets) if words]
+        if self.threshold is None or len(rows) < 2:
+            return duplicate
+
+        signatures = self.signatures([word_sets[i] for i in rows])
+        band_keys = (signatures.reshape(len(rows), self.bands, -1)
+                     * self.band_mix).sum(axis=2).tolist()
+        buckets = [{} for _ in range(self.bands)]
+        for row, keys in enumerate(band_keys):
+            candidates = {kept for bucket, key in zip(buckets, keys)
+                          for kept in bucket.get(key, ())}
+            if candidates:
+                similarity = (signatures[list(candidates)] == signatures[row]).mean(axis=1)
+                if similarity.max() >= self.threshold:
+                    duplicate[rows[row]] = True
+                    continue
+            for bucket, key in zip(buckets, keys):
+                bucket.setdefault(key, []).append(row)
+        return duplicate
+
+    def filter(self, titles, limit=None):
+        """Return (kept normalized titles, ``FilterReport``).
+
+        With ``limit``, at most that many titles are kept and the report
+        only covers the titles up to the last one kept.
+        """
+        # Per title: the FilterReport field it is counted in, or None if kept
+        outcomes, candidates, positions, word_sets, seen = [], [], [], [], set()
+        for title in titles:
+            title = self.normalize(title)
+            if not self.keep(title):
+                outcomes.append("skipped")
+                continue
+            words = self.words(title)
+            key = " ".join(words) or title.casefold()
+            if key in seen:
+                outcomes.append("duplicates")
+                continue
+            seen.add(key)
+            positions.append(len(outcomes))
+            outcomes.append(None)
+            candidates.append(title)
+            word_sets.append(sorted(set(words)))
+
+        duplicate = self.near_duplicates(word_sets)
+        for position in np.flatnonzero(duplicate):
+            outcomes[positions[position]] = "near_duplicates"
+        kept = [title for title, drop in zip(candidates, duplicate) if not drop]
+        if limit is not None and len(kept) > limit:
+            kept_positions = [position for position, drop in zip(positions, duplicate) if not drop]
+            outcomes = outcomes[:kept_positions[limit - 1] + 1] if limit else []
+            kept = kept[:limit]
+
+        report = FilterReport(total=len(outcomes))
+        for outcome in outcomes:
+            if outcome is not None:
+                setattr(report, outcome, getattr(report, outcome) + 1)
+        return kept, report
@@ -0,0 +1,175 @@
+"""Compact, vectorized vocabulary replacing the pickled Keras ``Tokenizer``.
+
+Convert a legacy saved tokenizer with:
+    python vocabulary.py saved_model/tokenizer.pkl [saved_model/vocab.npz]
+"""
+import os
+import pickle
+import sys
+import numpy as np
+
+VOCAB_FILE = "vocab.npz"
+LEGACY_TOKENIZER_FILE = "tokenizer.pkl"
+# The Keras Tokenizer defaults: characters replaced by spaces before splitting
+FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+# Joins titles for a single split; a control character no title contains
+# (and not NUL, which NumPy strips from the end of strings)
+SEPARATOR = "\x1f"
+TRANSLATION = str.maketrans(FILTERS, " " * len(FILTERS))
+
+
+class Vocabulary:
+    """Word <-> id mapping stored as a sorted string array plus an id array.
+
+    Ids follow the Keras ``Tokenizer`` ranking (1 is the most frequent
+    word, ties keep their order of first appearance) and words are split
+    the same way, so a vocabulary fitted on the same titles encodes them to
+    the same ids. Ids at or above ``num_words`` and unknown words are
+    dropped, as Keras does.
+
+    Whole title lists are encoded at once: every title is split in a
+    single pass over the joined text and all words are looked up with one
+    ``np.searchsorted``. The vocabulary is saved as a ``.npz`` of plain
+    arrays, so loading it does not unpickle any Python objects.
+    """
+
+    def __init__(self, num_words=None):
+        self.num_words = num_words
+        self.words = np.array([], dtype=str)
+        self.ids = np.array([], dtype=np.int32)
+        # Every fitted word in order of first appearance, with its count
+        self.seen_words = np.array([], dtype=str)
+        self.seen_counts = np.array([], dtype=np.int64)
+        self._word_index = None
+
+    @staticmethod
+    def split(texts):
+        """Split texts into words; return (words, number of words per text)"""
+        texts = list(texts)
+        if not texts:
+            return np.array([], dtype=str), np.zeros(0, dtype=np.int64)
+        joined = SEPARATOR.join(texts).lower().translate(TRANSLATION)
+        tokens = np.array(joined.replace(SEPARATOR, f" {SEPARATOR} ").split(" "))
+        tokens = tokens[tokens != ""]
+        is_separator = tokens == SEPARATOR
+        owners = np.cumsum(is_separator)[~is_separator]
+        return tokens[~is_separator], np.bincount(owners, minlength=len(texts))
+
+    @property
+    def size(self):
+        """Number of ids the vocabulary produces, including padding id 0"""
+        size = len(self.words) + 1
+        return min(size, self.num_words) if self.num_words else size
+
+    @property
+    def word_index(self):
+        """Word -> id dict, like ``Tokenizer.word_index``"""
+        if self._word_index is None:
+            self._word_index = dict(zip(self.words.tolist(), self.ids.tolist()))
+        return self._word_index
+
+    def index_words(self):
+        """Return an array mapping id -> word ("" for id 0)"""
+        index_word = np.full(len(self.words) + 1, "", dtype=object)
+        index_word[self.ids] = self.words
+        return index_word
+
+    def fit_on_texts(self, texts):
+        """Add the words of ``texts`` to the counts and re-rank the ids"""
+        words, _ = self.split(texts)
+        all_words = np.concatenate([self.seen_words, words])
+        weights = np.concatenate([self.seen_counts, np.ones(len(words), dtype=np.int64)])
+        unique, first, inverse = np.unique(all_words, return_index=True, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights, minlength=len(unique)).astype(np.int64)
+
+        order = np.argsort(first)
+        self.seen_words, self.seen_counts = unique[order], counts[order]
+        ranking = np.argsort(-self.seen_counts, kind="stable")
+        ids = np.empty(len(unique), dtype=np.int32)
+        ids[order[ranking]] = np.arange(1, len(unique) + 1)
+        self.words, self.ids = unique, ids
+        self._word_index = None
+
+    def encode(self, texts):
+        """Encode texts into (flat int32 ids, number of ids per text)"""
+        words, lengths = self.split(texts)
+        owners = np.repeat(np.arange(len(lengths)), lengths)
+        if not len(self.words) or not len(words):
+            return np.zeros(0, dtype=np.int32), np.zeros(len(lengths), dtype=np.int64)
+
+        dtype = np.promote_types(self.words.dtype, words.dtype)
+        vocabulary, words = self.words.astype(dtype, copy=False), words.astype(dtype, copy=False)
+        index = np.minimum(np.searchsorted(vocabulary, words), len(vocabulary) - 1)
+        ids = self.ids[index]
+        keep = vocabulary[index] == words
+        if self.num_words:
+            keep &= ids < self.num_words
+        return ids[keep], np.bincount(owners[keep], minlength=len(lengths))
+
+    def texts_to_sequences(self, texts):
+        """Encode texts into one id array per text, like ``Tokenizer.texts_to_sequences``"""
+        ids, lengths = self.encode(texts)
+        return np.split(ids, np.cumsum(lengths)[:-1]) if len(lengths) else []
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, words=self.words, ids=self.ids, seen_words=self.seen_words,
+                     seen_counts=self.seen_counts, num_words=np.array(self.num_words or 0))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            vocabulary = cls(int(data["num_words"]) or None)
+            vocabulary.words, vocabulary.ids = data["words"], data["ids"]
+            vocabulary.seen_words, vocabulary.seen_counts = data["seen_words"], data["seen_counts"]
+        return vocabulary
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer):
+        """Convert a fitted Keras ``Tokenizer`` (default filters, lowercasing)"""
+        vocabulary = cls(tokenizer.num_words)
+        vocabulary.seen_words = np.array(list(tokenizer.word_counts), dtype=str)
+        vocabulary.seen_counts = np.array(list(tokenizer.word_counts.values()), dtype=np.int64)
+        words = np.array(list(tokenizer.word_index), dtype=str)
+        order = np.argsort(words)
+        vocabulary.words = words[order]
+        vocabulary.ids = np.array(list(tokenizer.word_index.values()), dtype=np.int32)[order]
+        return vocabulary
+
+
+def save_tokenizer(tokenizer, directory):
+    """Save a vocabulary into a model directory"""
+    tokenizer.save(os.path.join(directory, VOCAB_FILE))
+
+
+def load_tokenizer(directory):
+    """Load a model directory's vocabulary, converting a legacy pickled tokenizer"""
+    path = os.path.join(directory, VOCAB_FILE)
+    if os.path.exists(path):
+        return Vocabulary.load(path)
+    with open(os.path.join(directory, LEGACY_TOKENIZER_FILE), "rb") as f:
+        return Vocabulary.from_tokenizer(pickle.load(f))
+
+
+def tokenizer_filename(directory):
+    """Return the vocabulary file name used by a model directory"""
+    if (os.path.exists(os.path.join(directory, LEGACY_TOKENIZER_FILE))
+            and not os.path.exists(os.path.join(directory, VOCAB_FILE))):
+        return LEGACY_TOKENIZER_FILE
+    return VOCAB_FILE
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit(__doc__)
+    source = sys.argv[1]
+    target = sys.argv[2] if len(sys.argv) == 3 else os.path.join(os.path.dirname(source),
+                                                                   VOCAB_FILE)
+    with open(source, "rb") as f:
+        vocabulary = Vocabulary.from_tokenizer(pickle.load(f))
+    vocabulary.save(target)
+    print(f"Converted {len(vocabulary.words)} words to {target}")
+
+
+if __name__ == "__main__":
+    main()